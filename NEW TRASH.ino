@@ -1,5 +1,6 @@
 #include <WiFi.h>
 #include <WebServer.h>
+#include <WiFiUdp.h>
 
 // Motor driver pins
 const int AIN1 = 13;
@@ -16,6 +17,19 @@ const char* password = "12345678";
 
 WebServer server(80);
 
+// Binary UDP control (motor_sender.UdpMotorSender), little-endian like the ESP32:
+// command: 'B' 'M' | uint32 seq | int16 speedA | int16 speedB | uint32 timestamp
+// ack:     'B' 'K' | uint32 seq | uint8 status | int16 speedA | int16 speedB | uint32 timestamp
+WiFiUDP udp;
+const unsigned int UDP_PORT = 4210;
+const int COMMAND_SIZE = 14;
+const int ACK_SIZE = 15;
+const uint8_t STATUS_APPLIED = 0;
+const uint8_t STATUS_STALE = 1;
+uint32_t lastUdpSeq = 0;
+unsigned long lastUdpTime = 0;
+bool udpSession = false;
+
 // Motor speeds (-255 to 255)
 int motorASpeed = 0;
 int motorBSpeed = 0;
@@ -62,11 +76,16 @@ void setup() {
   
   server.begin();
   Serial.println("✓ Web server started");
+  
+  udp.begin(UDP_PORT);
+  Serial.print("✓ UDP control on port ");
+  Serial.println(UDP_PORT);
   Serial.println("✓ Ready for autonomous control\n");
 }
 
 void loop() {
   server.handleClient();
+  handleUdp();
   
   // Safety timeout - stop motors if no command received
   if (autonomousMode && (millis() - lastCommandTime > COMMAND_TIMEOUT)) {
@@ -175,6 +194,31 @@ void handleRoot() {
 }
 
 void handleControl() {
+  // Combined form: /control?a=<speed>&b=<speed> sets both motors in one request
+  if (server.hasArg("a") || server.hasArg("b")) {
+    if (server.hasArg("a")) {
+      motorASpeed = constrain(server.arg("a").toInt(), -255, 255);
+      controlMotorA(motorASpeed);
+    }
+    if (server.hasArg("b")) {
+      motorBSpeed = constrain(server.arg("b").toInt(), -255, 255);
+      controlMotorB(motorBSpeed);
+    }
+    
+    // Update command timestamp
+    lastCommandTime = millis();
+    autonomousMode = true;
+    
+    // Log command
+    Serial.print("Motors A/B → Speed: ");
+    Serial.print(motorASpeed);
+    Serial.print(" / ");
+    Serial.println(motorBSpeed);
+    
+    server.send(200, "text/plain", "OK");
+    return;
+  }
+  
   String motor = server.arg("motor");
   int speed = server.arg("speed").toInt();
   
@@ -209,6 +253,66 @@ void handleControl() {
   server.send(200, "text/plain", "OK");
 }
 
+void handleUdp() {
+  int size = udp.parsePacket();
+  if (size == 0) {
+    return;
+  }
+  
+  uint8_t packet[COMMAND_SIZE];
+  if (size != COMMAND_SIZE || udp.read(packet, COMMAND_SIZE) != COMMAND_SIZE ||
+      packet[0] != 'B' || packet[1] != 'M') {
+    udp.flush();
+    return;
+  }
+  
+  uint32_t seq;
+  int16_t speedA;
+  int16_t speedB;
+  uint32_t timestamp;
+  memcpy(&seq, packet + 2, 4);
+  memcpy(&speedA, packet + 6, 2);
+  memcpy(&speedB, packet + 8, 2);
+  memcpy(&timestamp, packet + 10, 4);
+  
+  // Apply only packets newer than the last one (wraparound-safe); after a silence
+  // longer than the timeout any sequence starts a new session (tracker restarted)
+  unsigned long now = millis();
+  bool fresh = !udpSession || (now - lastUdpTime > COMMAND_TIMEOUT) ||
+               (int32_t)(seq - lastUdpSeq) > 0;
+  uint8_t status = STATUS_STALE;
+  if (fresh) {
+    lastUdpSeq = seq;
+    lastUdpTime = now;
+    udpSession = true;
+    
+    motorASpeed = constrain(speedA, -255, 255);
+    motorBSpeed = constrain(speedB, -255, 255);
+    controlMotorA(motorASpeed);
+    controlMotorB(motorBSpeed);
+    
+    // Same safety timeout as HTTP commands
+    lastCommandTime = now;
+    autonomousMode = true;
+    status = STATUS_APPLIED;
+  }
+  
+  // Acknowledge with the speeds now applied and the sender's timestamp
+  uint8_t ack[ACK_SIZE];
+  int16_t appliedA = motorASpeed;
+  int16_t appliedB = motorBSpeed;
+  ack[0] = 'B';
+  ack[1] = 'K';
+  memcpy(ack + 2, &seq, 4);
+  ack[6] = status;
+  memcpy(ack + 7, &appliedA, 2);
+  memcpy(ack + 9, &appliedB, 2);
+  memcpy(ack + 11, &timestamp, 4);
+  udp.beginPacket(udp.remoteIP(), udp.remotePort());
+  udp.write(ack, ACK_SIZE);
+  udp.endPacket();
+}
+
 void handleStop() {
   Serial.println("🛑 STOP command received");
   stopMotors();
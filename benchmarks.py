@@ -0,0 +1,802 @@
+"""
+Performance benchmarks for Blob Tracker
+Run with: python benchmarks.py [--baseline FILE] [--save-baseline FILE]
+Exits with status 1 when an exactness check fails or a stage regressed
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from blob_tracker import BlobTracker
+from blobs import BlobLabeller
+from bob import AutonomousBlobTracker
+from capture import SyntheticSource, make_synthetic_frame
+from centroid import mask_centroid
+from color_lut import BgrMaskLut, lut_accuracy
+from detection import NUMBA_AVAILABLE, NumbaBackend
+from esp32_stub import AsyncStubESP32Server, StubESP32Server
+from fleet import RoverLink
+from motion import MotionGate
+from noise_filter import evaluate_filters, print_evaluation, select_filter
+from motor_sender import MotorCommandSender, UdpMotorSender
+from multicolor import MultiColorDetector, targets_from_presets
+from pipeline import FramePipeline, steady_state_allocations
+from prediction import CentroidKalman
+
+# Resolutions used throughout the benchmarks
+RESOLUTIONS = {
+    "480p": (640, 480),
+    "720p": (1280, 720),
+    "1080p": (1920, 1080),
+}
+
+# Target blob radius as a fraction of the frame height for the stage suite
+BLOB_SIZES = {
+    "small": 0.04,
+    "medium": 0.1,
+    "large": 0.2,
+}
+
+# A stage is flagged when its median is this much slower than the baseline
+REGRESSION_TOLERANCE = 0.25
+# ...and at least this much slower in absolute terms (ignores timer noise)
+REGRESSION_MIN_MS = 0.05
+
+# Correctness checks that failed; any failure makes the run exit with status 1
+FAILED_CHECKS = []
+
+
+def check(passed, description):
+    """Record an exactness check; a failure is printed and fails the run"""
+    if not passed:
+        FAILED_CHECKS.append(description)
+        print(f"✗ Check failed: {description}")
+    return passed
+
+
+def time_call(func, *args, repeat=50, warmup=3):
+    """Median run time of func(*args) in milliseconds"""
+    for _ in range(warmup):
+        func(*args)
+
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        samples.append(time.perf_counter() - start)
+
+    return float(np.median(samples)) * 1000
+
+
+def synthetic_mask(width, height, radius_fraction=0.15):
+    """Binary 0/255 mask of one blob, like the output of detect_blob"""
+    frame = make_synthetic_frame(width, height, (width // 2, height // 2),
+                                 int(min(width, height) * radius_fraction), noise=0)
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    return cv2.inRange(hsv, np.array([34, 30, 94]), np.array([68, 116, 229]))
+
+
+def where_centroid(mask, min_area, max_area):
+    """Original np.where based get_average_position, kept as the reference"""
+    y_coords, x_coords = np.where(mask == 255)
+    if len(x_coords) == 0 or len(y_coords) == 0:
+        return None, 0
+    area = len(x_coords)
+    if area < min_area or area > max_area:
+        return None, 0
+    return (int(np.mean(x_coords)), int(np.mean(y_coords))), area
+
+
+def benchmark_centroid():
+    """Compare the np.where centroid with the running-sum centroid engine"""
+    print("\n=== Centroid: np.where vs running sums ===")
+    print(f"{'Resolution':<12}{'np.where':>12}{'sums':>12}{'speedup':>10}  match")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        mask = synthetic_mask(width, height)
+        max_area = width * height
+
+        reference = where_centroid(mask, 0, max_area)
+        result = mask_centroid(mask, 0, max_area)
+
+        where_ms = time_call(where_centroid, mask, 0, max_area)
+        sums_ms = time_call(mask_centroid, mask, 0, max_area)
+
+        print(f"{name:<12}{where_ms:>10.2f}ms{sums_ms:>10.2f}ms"
+              f"{where_ms / sums_ms:>9.1f}x  {'✓' if result == reference else '✗'}")
+        check(result == reference, f"running-sum centroid matches np.where at {name}")
+
+
+def synthetic_sequence(width, height, num_frames=60, radius=20):
+    """Frames of a small blob moving on a circular path"""
+    source = SyntheticSource(width, height, fps=0, radius=radius, num_frames=num_frames)
+    frames = []
+    while True:
+        ret, frame = source.read()
+        if not ret:
+            return frames
+        frames.append(frame)
+
+
+def run_tracker(tracker, frames):
+    """Track every frame; returns (mean ms per frame, list of centers)"""
+    centers = []
+    start = time.perf_counter()
+    for frame in frames:
+        center, _ = tracker.track(frame)
+        centers.append(center)
+    return (time.perf_counter() - start) * 1000 / len(frames), centers
+
+
+def benchmark_roi():
+    """Compare full-frame detection with ROI-windowed tracking on a small blob"""
+    print("\n=== Tracking: full frame vs ROI window (small blob) ===")
+    print(f"{'Resolution':<12}{'full':>12}{'roi':>12}{'speedup':>10}  max error")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        frames = synthetic_sequence(width, height)
+
+        full_tracker = BlobTracker()
+        full_tracker.min_blob_area = 100
+        full_tracker.roi_tracking = False
+        roi_tracker = BlobTracker()
+        roi_tracker.min_blob_area = 100
+        roi_tracker.roi_tracking = True
+
+        full_ms, full_centers = run_tracker(full_tracker, frames)
+        roi_ms, roi_centers = run_tracker(roi_tracker, frames)
+
+        errors = [max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+                  for a, b in zip(full_centers, roi_centers) if a and b]
+        max_error = max(errors) if errors else float("nan")
+
+        print(f"{name:<12}{full_ms:>10.2f}ms{roi_ms:>10.2f}ms"
+              f"{full_ms / roi_ms:>9.1f}x  {max_error}px")
+
+
+def benchmark_lut():
+    """Accuracy and throughput of the experimental BGR lookup table against cvtColor + inRange"""
+    lower_hsv = np.array([34, 30, 94])
+    upper_hsv = np.array([68, 116, 229])
+
+    def hsv_threshold(frame):
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        return cv2.inRange(hsv, lower_hsv, upper_hsv)
+
+    # Accuracy on synthetic scenes plus uniformly random colors (worst case)
+    rng = np.random.default_rng(0)
+    frames = synthetic_sequence(640, 480, num_frames=10, radius=60)
+    frames.append(rng.integers(0, 256, (480, 640, 3), dtype=np.uint8))
+
+    print("\n=== Thresholding: BGR lookup table accuracy vs full HSV ===")
+    print(f"{'Bits':<6}{'bins':>10}{'build':>10}{'agreement':>12}{'false +':>10}{'false -':>10}")
+    for bits in (5, 6, 8):
+        lut = BgrMaskLut(bits)
+        start = time.perf_counter()
+        lut.update(lower_hsv, upper_hsv)
+        build_ms = (time.perf_counter() - start) * 1000
+        agreement, false_positive, false_negative = lut_accuracy(lut, lower_hsv, upper_hsv, frames)
+        print(f"{bits:<6}{(1 << bits) ** 3:>10}{build_ms:>8.1f}ms{agreement * 100:>11.3f}%"
+              f"{false_positive:>10}{false_negative:>10}")
+
+    print("\n=== Thresholding: throughput ===")
+    print(f"{'Resolution':<12}{'hsv':>12}{'lut (6 bit)':>14}{'speedup':>10}")
+    lut = BgrMaskLut(6)
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = make_synthetic_frame(width, height, (width // 2, height // 2), height // 6)
+        hsv_ms = time_call(hsv_threshold, frame)
+        lut_ms = time_call(lut.apply, frame, lower_hsv, upper_hsv)
+        print(f"{name:<12}{hsv_ms:>10.2f}ms{lut_ms:>12.2f}ms{hsv_ms / lut_ms:>9.1f}x")
+
+
+def color_cube():
+    """Every 24-bit BGR color once, as a 4096x4096 image"""
+    b, g, r = np.meshgrid(np.arange(256), np.arange(256), np.arange(256), indexing="ij")
+    return np.stack([b, g, r], axis=-1).astype(np.uint8).reshape(4096, 4096, 3)
+
+
+def benchmark_backends():
+    """Fused Numba detection backend: exact equivalence with OpenCV, then speed"""
+    if not NUMBA_AVAILABLE:
+        print("\n⚠ numba not installed - skipping the detection backend comparison")
+        return
+
+    print("\n=== Detection backends: numba mask vs cvtColor + inRange (all 16.7M colors) ===")
+    cube = color_cube()
+    pipeline = FramePipeline()
+    backend = NumbaBackend(FramePipeline())
+    ranges = {
+        "blue": ([34, 30, 94], [68, 116, 229]),
+        "red (wraps)": ([170, 100, 100], [10, 255, 255]),
+        "everything": ([0, 0, 0], [179, 255, 255]),
+    }
+    for name, (lower_hsv, upper_hsv) in ranges.items():
+        lower_hsv, upper_hsv = np.array(lower_hsv), np.array(upper_hsv)
+        reference = pipeline.threshold(cube, lower_hsv, upper_hsv)
+        mask = backend.mask(cube, lower_hsv, upper_hsv)
+        differing = np.count_nonzero(mask != reference)
+        sums_match = backend.sums(cube, lower_hsv, upper_hsv) == pipeline.sums(reference)
+        print(f"{name:<14}{differing:>10} differing pixels, "
+              f"sums {'match' if sums_match else 'DIFFER'}")
+        check(differing == 0 and sums_match, f"numba mask and sums match cvtColor + inRange for {name}")
+
+    print("\n=== Detection backends: full-frame detect + centroid ===")
+    print(f"{'Resolution':<12}{'noise removal':<15}{'hsv':>10}{'numba':>11}{'speedup':>10}  same result")
+    for name, (width, height) in RESOLUTIONS.items():
+        frame, _ = make_scene(width, height, "medium")
+        for noise_removal in (True, False):
+            trackers = {}
+            for backend_name in ("hsv", "numba"):
+                tracker = BlobTracker()
+                tracker.roi_tracking = False
+                tracker.noise_removal = noise_removal
+                tracker.threshold_backend = backend_name
+                trackers[backend_name] = tracker
+            hsv_ms = time_call(trackers["hsv"].track, frame)
+            numba_ms = time_call(trackers["numba"].track, frame)
+            same = trackers["hsv"].track(frame) == trackers["numba"].track(frame)
+            print(f"{name:<12}{'on' if noise_removal else 'off':<15}{hsv_ms:>8.2f}ms{numba_ms:>9.2f}ms"
+                  f"{hsv_ms / numba_ms:>9.1f}x  {same}")
+            check(same, f"numba and hsv trackers agree at {name}, noise removal "
+                        f"{'on' if noise_removal else 'off'}")
+
+
+def speckled_sequence(width, height, num_frames=60, speckle=0.002, seed=0):
+    """
+    Blob moving on an ellipse plus target-colored specks and dropouts inside the blob
+    Returns (frames, true centers)
+    """
+    rng = np.random.default_rng(seed)
+    radius = height // 10
+    bgr = cv2.cvtColor(np.uint8([[(50, 80, 160)]]), cv2.COLOR_HSV2BGR)[0, 0]
+    frames, truths = [], []
+    for i in range(num_frames):
+        angle = 2 * np.pi * i / num_frames
+        center = (int(width / 2 + width / 4 * np.cos(angle)), int(height / 2 + height / 4 * np.sin(angle)))
+        frame = make_synthetic_frame(width, height, center, radius, rng=rng)
+        count = int(speckle * width * height)
+        frame[rng.integers(0, height, count), rng.integers(0, width, count)] = bgr
+        # Clumps of 2x2 specks survive single-pixel cleanup
+        ys, xs = rng.integers(0, height - 1, count // 8), rng.integers(0, width - 1, count // 8)
+        for dy in (0, 1):
+            for dx in (0, 1):
+                frame[ys + dy, xs + dx] = bgr
+        angles = rng.uniform(0, 2 * np.pi, count // 8)
+        distances = radius * np.sqrt(rng.uniform(0, 0.8, count // 8))
+        frame[(center[1] + distances * np.sin(angles)).astype(int),
+              (center[0] + distances * np.cos(angles)).astype(int)] = 40
+        frames.append(frame)
+        truths.append(center)
+    return frames, truths
+
+
+def benchmark_noise_filters():
+    """Cost and centroid stability of each mask noise filter on speckled frames"""
+    for name in ("480p", "1080p"):
+        width, height = RESOLUTIONS[name]
+        frames, truths = speckled_sequence(width, height, num_frames=30)
+        tracker = BlobTracker()
+        tracker.max_blob_area = width * height
+        results = evaluate_filters(tracker, frames, truths)
+        print(f"\n=== Noise filters: {name}, speckled frames (error vs true center) ===")
+        print_evaluation(results, select_filter(results))
+
+
+def two_blob_mask(width, height, spread):
+    """Mask with a large and a small blob; spread puts them in opposite corners"""
+    mask = np.zeros((height, width), np.uint8)
+    radius = height // 12
+    if spread:
+        centers = [(2 * radius, 2 * radius), (width - 2 * radius, height - 2 * radius)]
+    else:
+        centers = [(width // 2 - 2 * radius, height // 2), (width // 2 + 2 * radius, height // 2)]
+    cv2.circle(mask, centers[0], radius, 255, -1)
+    cv2.circle(mask, centers[1], radius // 2, 255, -1)
+    return mask
+
+
+def benchmark_blob_table():
+    """Connected-component blob table vs the single-centroid paths on the same mask"""
+    print("\n=== Blobs: np.where centroid vs sums vs connected-component table ===")
+    print(f"{'Resolution':<12}{'layout':<10}{'np.where':>12}{'sums':>12}{'table':>12}  blobs  same total")
+    labeller = BlobLabeller()
+
+    for name, (width, height) in RESOLUTIONS.items():
+        for spread in (False, True):
+            mask = two_blob_mask(width, height, spread)
+            max_area = width * height
+
+            where_ms = time_call(where_centroid, mask, 0, max_area)
+            sums_ms = time_call(mask_centroid, mask, 0, max_area)
+            table_ms = time_call(labeller.label, mask, 0, max_area)
+
+            # "all" must reproduce the pixel average when every blob is kept
+            table = labeller.label(mask, 0, max_area)
+            same = table.combined() == mask_centroid(mask, 0, max_area)
+            print(f"{name:<12}{'spread' if spread else 'close':<10}{where_ms:>10.2f}ms{sums_ms:>10.2f}ms"
+                  f"{table_ms:>10.2f}ms  {len(table):>5}  {'✓' if same else '✗'}")
+            check(same, f"blob table total matches the pixel average at {name} "
+                        f"({'spread' if spread else 'close'})")
+
+
+def benchmark_tiling():
+    """Full-frame detection split into horizontal strips on a thread pool"""
+    print(f"\n=== Tiled detection: strips on a thread pool ({os.cpu_count()} cores) ===")
+    print(f"{'Resolution':<12}{'1 strip':>12}{'2 strips':>12}{'4 strips':>12}  same result")
+
+    resolutions = dict(RESOLUTIONS, **{"4K": (3840, 2160)})
+    for name in ("720p", "1080p", "4K"):
+        width, height = resolutions[name]
+        frame, _ = make_scene(width, height, "medium")
+        times = {}
+        results = {}
+        for strips in (1, 2, 4):
+            tracker = BlobTracker()
+            tracker.roi_tracking = False
+            tracker.strips = strips
+            times[strips] = time_call(tracker.locate_blob, frame, repeat=20)
+            results[strips] = tracker.locate_blob(frame)
+            if tracker.tiler is not None:
+                tracker.tiler.close()
+        same = results[2] == results[1] and results[4] == results[1]
+        print(f"{name:<12}{times[1]:>10.2f}ms{times[2]:>10.2f}ms{times[4]:>10.2f}ms  {'✓' if same else '✗'}")
+        check(same, f"tiled detection matches one pass at {name}")
+
+
+def benchmark_pyramid():
+    """Compare full-resolution detection with automatic pyramid scale selection"""
+    print("\n=== Detection: full resolution vs pyramid (large blob) ===")
+    print(f"{'Resolution':<12}{'full':>12}{'pyramid':>12}{'speedup':>10}  max error  same commands")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        frames = synthetic_sequence(width, height, radius=height // 8)
+
+        full_tracker = BlobTracker()
+        full_tracker.roi_tracking = False
+        full_tracker.max_blob_area = width * height
+        pyramid_tracker = BlobTracker()
+        pyramid_tracker.roi_tracking = False
+        pyramid_tracker.max_blob_area = width * height
+        pyramid_tracker.pyramid_detection = True
+
+        full_ms, full_centers = run_tracker(full_tracker, frames)
+        pyramid_ms, pyramid_centers = run_tracker(pyramid_tracker, frames)
+
+        errors = [max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+                  for a, b in zip(full_centers, pyramid_centers) if a and b]
+        max_error = max(errors) if errors else float("nan")
+        same_commands = sum(
+            full_tracker.get_direction_command(a, frames[0].shape).split(" - ")[0]
+            == pyramid_tracker.get_direction_command(b, frames[0].shape).split(" - ")[0]
+            for a, b in zip(full_centers, pyramid_centers))
+
+        print(f"{name:<12}{full_ms:>10.2f}ms{pyramid_ms:>10.2f}ms"
+              f"{full_ms / pyramid_ms:>9.1f}x  {max_error:>7}px  {same_commands}/{len(frames)}")
+
+
+def allocating_detect(frame, lower_hsv, upper_hsv):
+    """Original detect_blob + get_average_position, allocating every image"""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, lower_hsv, upper_hsv)
+    kernel = np.ones((5, 5), np.uint8)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
+    mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
+    return where_centroid(mask, 500, 50000)
+
+
+def benchmark_allocations():
+    """Peak Python/NumPy allocations per steady-state frame (tracemalloc)"""
+    print("\n=== Memory: steady-state allocations while tracking ===")
+    print(f"{'Resolution':<12}{'frame size':>12}{'allocating':>14}{'pipeline':>12}{'rebuilds':>10}")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        frame = make_synthetic_frame(width, height, (width // 2, height // 2), height // 8)
+        tracker = BlobTracker()
+        tracker.roi_tracking = False
+
+        allocating_peak = steady_state_allocations(
+            lambda: allocating_detect(frame, tracker.lower_hsv, tracker.upper_hsv), frames=20)
+        pipeline_peak = steady_state_allocations(lambda: tracker.track(frame))
+
+        print(f"{name:<12}{frame.nbytes:>11,}B{allocating_peak:>13,}B{pipeline_peak:>11,}B"
+              f"{tracker.pipeline.allocations:>10}")
+
+
+def benchmark_motion_gate(num_frames=60):
+    """Detection cost with and without the motion gate on static and moving scenes"""
+    print("\n=== Motion gate: reuse detections on unchanged frames ===")
+    print(f"{'Scene':<20}{'always':>12}{'gated':>12}{'reused':>9}  max error")
+
+    rng = np.random.default_rng(0)
+    for name, (width, height) in RESOLUTIONS.items():
+        center = (width // 3, height // 3)
+        radius = height // 10
+        scenes = {
+            # Fresh sensor noise on every frame, nothing moves
+            "static": [make_synthetic_frame(width, height, center, radius, rng=rng)
+                       for _ in range(num_frames)],
+            "moving": synthetic_sequence(width, height, num_frames, radius),
+        }
+        for scene, frames in scenes.items():
+            tracker = BlobTracker()
+            tracker.min_blob_area = 100
+            gated = BlobTracker()
+            gated.min_blob_area = 100
+            gated.motion_gate = MotionGate()
+
+            always_ms, always_centers = run_tracker(tracker, frames)
+            gated_ms, gated_centers = run_tracker(gated, frames)
+
+            errors = [max(abs(a[0] - b[0]), abs(a[1] - b[1]))
+                      for a, b in zip(always_centers, gated_centers) if a and b]
+            max_error = max(errors) if errors else float("nan")
+            print(f"{name + ' ' + scene:<20}{always_ms:>10.2f}ms{gated_ms:>10.2f}ms"
+                  f"{gated.motion_gate.stats()['hit_rate']:>9.0%}  {max_error}px")
+
+
+def multicolor_scene(width, height, targets, rng):
+    """
+    One blob per target color over noise, in a hue no other target covers
+    Returns (frame, drawn centers)
+    """
+    def hues(target):
+        low, high = target.lower_hsv[0], target.upper_hsv[0]
+        return set(range(low, high + 1)) if low <= high else set(range(low, 180)) | set(range(high + 1))
+
+    frame = make_synthetic_frame(width, height, (width // 2, height // 2), 0, rng=rng)
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    radius = height // 16
+    centers = []
+    for index, target in enumerate(targets):
+        # e.g. orange (5..15) and red (170..10) share 5..10
+        others = set().union(*(hues(other) for other in targets if other is not target))
+        own = sorted(hues(target) - others)
+        center = ((index + 1) * width // (len(targets) + 1), height // 2)
+        cv2.circle(hsv, center, radius, (own[len(own) // 2], 200, 200), -1)
+        centers.append(center)
+    return cv2.cvtColor(hsv, cv2.COLOR_HSV2BGR), centers
+
+
+def benchmark_multicolor():
+    """N colors in one labelling pass vs N single-color trackers"""
+    print("\n=== Multi-color: one labelling pass vs one pipeline per color ===")
+    print(f"{'Resolution':<12}{'colors':>8}{'per color':>12}{'single pass':>13}{'speedup':>10}  agree")
+
+    all_targets = targets_from_presets(min_blob_area=100)
+    for name, (width, height) in RESOLUTIONS.items():
+        frame, drawn = multicolor_scene(width, height, all_targets, np.random.default_rng(0))
+        for count in (1, 3, 5):
+            targets = all_targets[:count]
+            trackers = []
+            for target in targets:
+                tracker = BlobTracker()
+                tracker.roi_tracking = False
+                tracker.lower_hsv = np.array(target.lower_hsv)
+                tracker.upper_hsv = np.array(target.upper_hsv)
+                tracker.min_blob_area = target.min_blob_area
+                trackers.append(tracker)
+            detector = MultiColorDetector(targets)
+
+            separate_ms = time_call(lambda: [tracker.track(frame) for tracker in trackers])
+            single_ms = time_call(detector.detect, frame)
+            blobs = detector.detect(frame)
+            agree = all((blob.center, blob.area) == tracker.track(frame)
+                        for blob, tracker in zip(blobs, trackers))
+            print(f"{name:<12}{count:>8}{separate_ms:>10.2f}ms{single_ms:>11.2f}ms"
+                  f"{separate_ms / single_ms:>9.1f}x  {agree}")
+            check(agree, f"multicolor matches separate trackers at {name}, {count} colors")
+            # Every color must find only its own blob, or agreement proves nothing
+            own = all(blob.center is not None and abs(blob.center[0] - x) <= 1 and abs(blob.center[1] - y) <= 1
+                      for blob, (x, y) in zip(blobs, drawn))
+            check(own, f"multicolor finds each color's own blob at {name}, {count} colors")
+
+
+def benchmark_prediction(latency=0.12, fps=30, seconds=20, miss_rate=0.1, jitter=2.0):
+    """Steering error at command delivery time: raw detections vs Kalman prediction"""
+    print(f"\n=== Prediction: position error {latency * 1000:.0f}ms after capture "
+          f"({miss_rate:.0%} missed frames) ===")
+    print(f"{'Estimator':<16}{'mean':>10}{'p95':>10}{'max':>10}")
+
+    rng = np.random.default_rng(0)
+    times = np.arange(0, seconds, 1.0 / fps)
+
+    def blob_y(t):
+        # Target weaving up and down, with speed changes
+        return 240 + 150 * np.sin(1.3 * t) + 40 * np.sin(3.1 * t)
+
+    detections = [None if rng.random() < miss_rate
+                  else (320.0, blob_y(t) + rng.normal(0, jitter)) for t in times]
+
+    estimators = {
+        "raw": None,
+        "velocity": CentroidKalman("velocity"),
+        "acceleration": CentroidKalman("acceleration"),
+    }
+    for name, predictor in estimators.items():
+        errors = []
+        last = None
+        for t, detection in zip(times, detections):
+            if predictor is None:
+                # Current behaviour: steer on the last detection
+                last = detection or last
+                estimate = last
+            else:
+                predictor.update(detection, t)
+                estimate = predictor.predict(t + latency)
+            if estimate is not None and t > 1.0:
+                errors.append(abs(estimate[1] - blob_y(t + latency)))
+        errors = np.array(errors)
+        print(f"{name:<16}{errors.mean():>8.1f}px{np.percentile(errors, 95):>8.1f}px"
+              f"{errors.max():>8.1f}px")
+
+
+def benchmark_transport(repeat=200, loss=0.1, stream=300):
+    """Motor command round trip over HTTP vs binary UDP, and UDP under packet loss"""
+    print("\n=== Motor transport: round trip against the local ESP32 stub ===")
+    print(f"{'Transport':<12}{'p50':>10}{'p95':>10}{'p99':>10}")
+
+    # The rover's WebServer may or may not keep connections alive, so HTTP is
+    # measured both ways
+    server = StubESP32Server(udp_port=0).start()
+    closing_server = StubESP32Server(keep_alive=False).start()
+    senders = {
+        "http": MotorCommandSender(server.address),
+        "http close": MotorCommandSender(closing_server.address),
+        "udp": UdpMotorSender(*server.udp_address),
+    }
+    for name, sender in senders.items():
+        stats = percentiles(sample_call(sender.send_now, lambda: (100, 100), repeat=repeat))
+        print(f"{name:<12}{stats['p50_ms']:>8.3f}ms{stats['p95_ms']:>8.3f}ms{stats['p99_ms']:>8.3f}ms")
+        check(sender.failed == 0, f"transport: {sender.failed} '{name}' commands failed")
+        sender.stop()
+    server.stop()
+    closing_server.stop()
+
+    # Stream of non-blocking commands with datagrams dropped both ways
+    server = StubESP32Server(udp_port=0, udp_loss=loss).start()
+    sender = UdpMotorSender(*server.udp_address, timeout=0.1)
+    for i in range(stream):
+        sender.submit(i % 256, -(i % 256))
+        time.sleep(0.002)
+    time.sleep(0.2)
+    stats = sender.stats()
+    stopped = sender.send_now(0)
+    sender.stop()
+    server.stop()
+    print(f"udp, {loss:.0%} loss each way: {stats['datagrams']} sent, {stats['sent']} acked, "
+          f"{stats['failed']} unacknowledged ({stats['loss_rate']:.1%}), "
+          f"applied {server.udp_stats['applied']}, final stop acknowledged: {stopped}")
+
+
+def benchmark_fleet(sizes=(8, 32, 64), delay=0.005, ticks=20):
+    """
+    One command to every rover: sequential blocking requests vs the asyncio
+    fleet links, against stand-in rovers that keep connections alive and
+    ones that close them after every response
+    """
+    print(f"\n=== Fleet: one command to every rover ({delay * 1000:.0f}ms stub response delay) ===")
+    print(f"{'Rovers':<8}{'connection':<12}{'sequential':>12}{'asyncio':>12}{'speedup':>10}"
+          f"  connections/rover  all stopped")
+
+    # The stand-in rovers run on their own event loop thread
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+
+    async def fleet_ticks(addresses):
+        links = [RoverLink(address) for address in addresses]
+        samples = []
+        for _ in range(ticks + 3):
+            start = time.perf_counter()
+            await asyncio.gather(*(link.send(100, 100) for link in links))
+            samples.append(time.perf_counter() - start)
+        stopped = await asyncio.gather(*(link.stop() for link in links))
+        failed = sum(link.failed for link in links)
+        retries = sum(link.pool.retries for link in links)
+        return (float(np.median(samples[3:])) * 1000, max(link.pool.opened for link in links), all(stopped),
+                failed, retries)
+
+    for count in sizes:
+        for keep_alive in (True, False):
+            servers = [asyncio.run_coroutine_threadsafe(
+                AsyncStubESP32Server(delay=delay, keep_alive=keep_alive).start(), loop).result()
+                for _ in range(count)]
+            addresses = [server.address for server in servers]
+
+            senders = [MotorCommandSender(address) for address in addresses]
+            sequential_ms = time_call(lambda: [sender.send_now(100) for sender in senders], repeat=ticks)
+            for sender in senders:
+                sender.stop()
+
+            async_ms, connections, stopped, failed, retries = asyncio.run(fleet_ticks(addresses))
+            for server in servers:
+                asyncio.run_coroutine_threadsafe(server.stop(), loop).result()
+            mode = "keep-alive" if keep_alive else "close"
+            print(f"{count:<8}{mode:<12}{sequential_ms:>10.1f}ms{async_ms:>10.1f}ms"
+                  f"{sequential_ms / async_ms:>9.1f}x  {connections:>17}  {'✓' if stopped else '✗'}")
+            check(failed == 0, f"fleet: {failed} commands to {count} '{mode}' rovers failed")
+            if not keep_alive:
+                # Closed connections must not be reused: every request, the
+                # final stop included, gets a fresh one without a retry
+                check(connections == ticks + 4 and retries == 0,
+                      f"fleet: {connections} connections and {retries} retries for {ticks + 4} "
+                      f"requests to a closing rover")
+
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+
+
+def make_scene(width, height, blob_size, seed=0):
+    """
+    Deterministic test scene: noisy background, the target blob and a
+    differently colored distractor blob. Returns (frame, target center).
+    """
+    rng = np.random.default_rng(seed)
+    radius = max(2, int(height * BLOB_SIZES[blob_size]))
+    center = (int(rng.integers(radius, width - radius)), int(rng.integers(radius, height - radius)))
+    frame = make_synthetic_frame(width, height, center, radius, rng=rng)
+
+    # Red distractor that must not be picked up by the default HSV range
+    distractor = (width - center[0], height - center[1])
+    cv2.circle(frame, distractor, radius // 2, (0, 0, 200), -1)
+    return frame, center
+
+
+def percentiles(samples):
+    """p50/p95/p99 of run times in milliseconds"""
+    values = np.array(samples) * 1000
+    return {
+        "p50_ms": float(np.percentile(values, 50)),
+        "p95_ms": float(np.percentile(values, 95)),
+        "p99_ms": float(np.percentile(values, 99)),
+    }
+
+
+def sample_call(func, prepare=None, repeat=100, warmup=5):
+    """Run times in seconds; prepare() builds fresh arguments outside the timing"""
+    samples = []
+    for i in range(warmup + repeat):
+        args = prepare() if prepare else ()
+        start = time.perf_counter()
+        func(*args)
+        elapsed = time.perf_counter() - start
+        if i >= warmup:
+            samples.append(elapsed)
+    return samples
+
+
+def benchmark_stages(repeat=100):
+    """
+    Time each tracking stage separately and end to end on synthetic scenes
+    Returns {"<resolution>/<blob size>/<stage>": {"p50_ms": ..., ...}}
+    """
+    results = {}
+    print("\n=== Per-stage timings (p50 / p95 / p99 ms) ===")
+
+    for name, (width, height) in RESOLUTIONS.items():
+        for blob_size in BLOB_SIZES:
+            frame, _ = make_scene(width, height, blob_size)
+
+            tracker = BlobTracker()
+            tracker.roi_tracking = False
+            tracker.min_blob_area = 50
+            tracker.max_blob_area = width * height
+            rover = AutonomousBlobTracker(check_connection=False)
+
+            mask = tracker.detect_blob(frame).copy()
+            center, area = tracker.get_average_position(mask)
+            command = tracker.get_direction_command(center, frame.shape)
+
+            def end_to_end(image):
+                found, pixels = tracker.track(image)
+                text = tracker.get_direction_command(found, image.shape)
+                rover.calculate_motor_speed(found, image.shape)
+                tracker.draw_overlay(image, found, pixels, text)
+
+            stages = {
+                "detect_blob": sample_call(lambda: tracker.detect_blob(frame), repeat=repeat),
+                "get_average_position": sample_call(lambda: tracker.get_average_position(mask),
+                                                    repeat=repeat),
+                "get_direction_command": sample_call(
+                    lambda: tracker.get_direction_command(center, frame.shape), repeat=repeat),
+                "calculate_motor_speed": sample_call(
+                    lambda: rover.calculate_motor_speed(center, frame.shape), repeat=repeat),
+                "draw_overlay": sample_call(lambda image: tracker.draw_overlay(image, center, area, command),
+                                            prepare=lambda: (frame.copy(),), repeat=repeat),
+                "end_to_end": sample_call(end_to_end, prepare=lambda: (frame.copy(),), repeat=repeat),
+            }
+
+            for stage, samples in stages.items():
+                key = f"{name}/{blob_size}/{stage}"
+                results[key] = percentiles(samples)
+                stats = results[key]
+                print(f"{key:<42}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}")
+
+    return results
+
+
+def save_baseline(results, filename):
+    """Write stage results to a JSON baseline file"""
+    with open(filename, "w") as f:
+        json.dump({"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "results": results}, f, indent=2)
+    print(f"✓ Baseline saved to {filename}")
+
+
+def compare_baseline(results, filename, tolerance=REGRESSION_TOLERANCE):
+    """
+    Flag stages whose median got slower than the baseline by more than tolerance
+    Returns the list of regressed stage keys
+    """
+    with open(filename, "r") as f:
+        baseline = json.load(f)["results"]
+
+    regressions = []
+    print(f"\n=== Regression check against {filename} (tolerance {tolerance:.0%}) ===")
+    for key, stats in results.items():
+        if key not in baseline:
+            continue
+        before = baseline[key]["p50_ms"]
+        after = stats["p50_ms"]
+        change = (after - before) / before if before > 0 else 0.0
+        if change > tolerance and after - before > REGRESSION_MIN_MS:
+            regressions.append(key)
+            print(f"✗ {key}: {before:.3f}ms → {after:.3f}ms ({change:+.0%})")
+
+    if regressions:
+        print(f"✗ {len(regressions)} regression(s) found")
+    else:
+        print("✓ No regressions")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blob Tracker benchmarks")
+    parser.add_argument("--stages-only", action="store_true",
+                        help="only run the per-stage suite")
+    parser.add_argument("--repeat", type=int, default=100,
+                        help="timed runs per stage (default: 100)")
+    parser.add_argument("--baseline", default=None,
+                        help="JSON baseline to check for regressions")
+    parser.add_argument("--save-baseline", default=None,
+                        help="write the per-stage results to this JSON file")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE,
+                        help="allowed slowdown before a stage is flagged (default: 0.25)")
+    args = parser.parse_args()
+
+    print("Blob Tracker - Benchmarks")
+    if not args.stages_only:
+        benchmark_centroid()
+        benchmark_roi()
+        benchmark_lut()
+        benchmark_backends()
+        benchmark_noise_filters()
+        benchmark_blob_table()
+        benchmark_tiling()
+        benchmark_pyramid()
+        benchmark_allocations()
+        benchmark_motion_gate()
+        benchmark_multicolor()
+        benchmark_prediction()
+        benchmark_transport()
+        benchmark_fleet()
+
+    results = benchmark_stages(args.repeat)
+    if args.save_baseline:
+        save_baseline(results, args.save_baseline)
+    regressions = compare_baseline(results, args.baseline, args.tolerance) if args.baseline else []
+
+    # Exactness checks fail the run like regressions, so CI catches a divergence
+    if FAILED_CHECKS:
+        print(f"\n✗ {len(FAILED_CHECKS)} correctness check(s) failed:")
+        for description in FAILED_CHECKS:
+            print(f"  - {description}")
+    if FAILED_CHECKS or regressions:
+        sys.exit(1)
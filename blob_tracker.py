@@ -1,20 +1,25 @@
+import argparse
+import time
+
 import cv2
 import numpy as np
 
-class BlobTracker:
+from capture import LatestFrameSource, is_live_source, open_capture
+from detection import BlobDetection
+from preview import PREVIEW_FPS, PreviewWindow, StaticOverlayCache
+from recording import RecordingSource
+from settings import Settings, SettingsWatcher
+
+class BlobTracker(BlobDetection):
     def __init__(self):
-        # Default HSV color range (Blue)
-        self.lower_hsv = np.array([34, 30, 94])
-        self.upper_hsv = np.array([68, 116, 229])
+        # Color range, size limits, tracking state and detection backends
+        super().__init__()
         
-        # Blob size limits (in pixels)
-        self.min_blob_area = 500
-        self.max_blob_area = 50000
+        # Dead zone (pixels from center where we don't need to adjust)
+        self.dead_zone = 50
         
-        # Tracking state
-        self.last_position = None
-        self.frames_lost = 0
-        self.max_frames_lost = 10
+        # Center line and dead zone, pre-rendered per frame size and dead zone
+        self.overlay_cache = StaticOverlayCache()
         
     def create_trackbars(self):
         """Create window with trackbars for color adjustment"""
@@ -47,50 +52,25 @@ class BlobTracker:
         self.min_blob_area = cv2.getTrackbarPos('Min Area', 'Color Adjustments')
         self.max_blob_area = cv2.getTrackbarPos('Max Area', 'Color Adjustments')
     
-    def detect_blob(self, frame):
-        """Detect the colored blob in the frame"""
-        # Convert to HSV
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        
-        # Create mask
-        mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
-        
-        # Remove noise
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        
-        return mask
-    
-    def get_average_position(self, mask):
-        """Calculate average position of all white pixels (1s) in the mask"""
-        # Find all coordinates where mask value is 255 (white/1)
-        y_coords, x_coords = np.where(mask == 255)
-        
-        # Check if any white pixels exist
-        if len(x_coords) == 0 or len(y_coords) == 0:
-            return None, 0
-        
-        # Calculate total area (number of white pixels)
-        area = len(x_coords)
-        
-        # Check if area is within bounds
-        if area < self.min_blob_area or area > self.max_blob_area:
-            return None, 0
-        
-        # Calculate average position
-        avg_x = int(np.mean(x_coords))
-        avg_y = int(np.mean(y_coords))
-        
-        return (avg_x, avg_y), area
+    def apply_config(self, config):
+        """Apply an immutable TrackerConfig snapshot (headless mode)"""
+        self.lower_hsv = np.array(config.lower_hsv)
+        self.upper_hsv = np.array(config.upper_hsv)
+        self.min_blob_area = config.min_blob_area
+        self.max_blob_area = config.max_blob_area
+        self.dead_zone = config.dead_zone
+        self.noise_filter = config.noise_filter
+        self.blob_selection = config.blob_selection
+        self.roi_tracking = config.roi_tracking
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
     
     def get_direction_command(self, center, frame_shape):
         """Determine rover movement command based on blob position"""
         height, width = frame_shape[:2]
         frame_center_x = width // 2
         
-        # Dead zone (pixels from center where we don't need to adjust)
-        dead_zone = 50
+        dead_zone = self.dead_zone
         
         if center is None:
             return "STOP - Lost tracking"
@@ -105,19 +85,27 @@ class BlobTracker:
         else:
             return f"TURN LEFT - Error: {abs(error)}px"
     
-    def draw_overlay(self, frame, center, area, command):
-        """Draw tracking information on frame"""
-        height, width = frame.shape[:2]
+    def draw_static_overlay(self, layer):
+        """Draw the elements that only change with frame size and dead zone"""
+        height, width = layer.shape[:2]
         frame_center_x = width // 2
         
         # Draw center line
-        cv2.line(frame, (frame_center_x, 0), (frame_center_x, height), (255, 255, 255), 2)
+        cv2.line(layer, (frame_center_x, 0), (frame_center_x, height), (255, 255, 255), 2)
         
         # Draw dead zone
-        cv2.rectangle(frame, 
-                     (frame_center_x - 50, 0), 
-                     (frame_center_x + 50, height), 
+        cv2.rectangle(layer, 
+                     (frame_center_x - self.dead_zone, 0), 
+                     (frame_center_x + self.dead_zone, height), 
                      (200, 200, 200), 1)
+    
+    def draw_overlay(self, frame, center, area, command):
+        """Draw tracking information on frame"""
+        height, width = frame.shape[:2]
+        frame_center_x = width // 2
+        
+        # Center line and dead zone come from the cached static layer
+        self.overlay_cache.apply(frame, self.dead_zone, self.draw_static_overlay)
         
         if center:
             # Draw single RED circle at average position
@@ -139,13 +127,112 @@ class BlobTracker:
         
         return frame
 
-def main():
+def run_headless(tracker, cap, watcher):
+    """Track without any windows; settings come from the hot-reloaded file"""
+    print("Headless mode - press Ctrl+C to quit")
+    print(f"Settings file: {watcher.filename} (reloaded on change)")
+    
+    frames = 0
+    report_time = time.monotonic()
+    try:
+        while True:
+            captured = cap.read_latest(timeout=5.0)
+            if captured is None:
+                print("Failed to grab frame")
+                break
+            
+            # Cheap mtime check; apply the new snapshot only when it changed
+            config = watcher.poll()
+            if config is not None:
+                tracker.apply_config(config)
+                print(f"✓ Settings v{config.version} applied")
+            
+            center, area = tracker.track(captured.frame)
+            command = tracker.get_direction_command(center, captured.frame.shape)
+            
+            # Periodic status line instead of a preview window
+            frames += 1
+            now = time.monotonic()
+            if now - report_time >= 1.0:
+                print(f"{frames / (now - report_time):5.1f} fps | {command}")
+                frames = 0
+                report_time = now
+    except KeyboardInterrupt:
+        pass
+
+def run_interactive(tracker, cap, preview_fps=PREVIEW_FPS):
+    """Track with the preview window and trackbars (tracking on a worker thread)"""
+    print("=" * 50)
+    print("BLOB TRACKER - AVERAGE POSITION MODE")
+    print("=" * 50)
+    print("Controls:")
+    print("  - Adjust trackbars to tune color detection")
+    print("  - Press 'q' to quit")
+    print("  - Press 's' to save current settings")
+    print("=" * 50)
+    print("Tracking: Single RED point = average of all detected pixels")
+    print("=" * 50)
+    
+    # The preview window and trackbars stay on the main thread (required by
+    # HighGUI on macOS); tracking runs on a worker thread at camera rate
+    preview = PreviewWindow('Blob Tracker', tracker.draw_overlay, preview_fps,
+                            setup=tracker.create_trackbars,
+                            poll=tracker.get_trackbar_values)
+    
+    def track_loop():
+        while preview.running:
+            captured = cap.read_latest(timeout=5.0)
+            if captured is None:
+                print("Failed to grab frame")
+                break
+            frame = captured.frame
+            
+            # Detect blob and get average position of all white pixels
+            # (with --roi, only around the last position while tracking)
+            center, area = tracker.track(frame)
+            
+            # Get movement command
+            command = tracker.get_direction_command(center, frame.shape)
+            
+            # Overlay and display happen on the main thread at preview_fps
+            preview.submit(frame, center, area, command)
+            
+            # Handle key presses
+            key = preview.read_key()
+            if key == ord('q'):
+                break
+            elif key == ord('s'):
+                print(f"\nSaved Settings:")
+                print(f"Lower HSV: {tracker.lower_hsv}")
+                print(f"Upper HSV: {tracker.upper_hsv}")
+                print(f"Min Area: {tracker.min_blob_area}")
+                print(f"Max Area: {tracker.max_blob_area}")
+    
+    try:
+        preview.run(track_loop)
+    except KeyboardInterrupt:
+        pass
+
+def main(source=0, headless=False, settings_file=None, preview_fps=PREVIEW_FPS,
+         record=None, realtime=False, roi=False):
     # Initialize tracker
     tracker = BlobTracker()
-    tracker.create_trackbars()
+    if roi:
+        # A settings file's roi_tracking still takes precedence
+        tracker.roi_tracking = True
+    watcher = None
+    if headless:
+        watcher = SettingsWatcher(settings_file, defaults=Settings.settings_from_tracker(tracker))
+        if watcher.config is not None:
+            tracker.apply_config(watcher.config)
+        else:
+            print(f"⚠ Settings file not found: {watcher.filename} - using defaults until it appears")
+    else:
+        if settings_file:
+            Settings.load_settings(tracker, settings_file)
     
-    # Open camera (0 for default camera, or video file path)
-    cap = cv2.VideoCapture(0)
+    # Open camera (0 for default camera, video file path, or 'synthetic')
+    cap = open_capture(source, realtime=realtime)
     
     if not cap.isOpened():
         print("Error: Could not open camera")
@@ -162,54 +249,41 @@ def main():
     except:
         pass
     
-    print("=" * 50)
-    print("BLOB TRACKER - AVERAGE POSITION MODE")
-    print("=" * 50)
-    print("Controls:")
-    print("  - Adjust trackbars to tune color detection")
-    print("  - Press 'q' to quit")
-    print("  - Press 's' to save current settings")
-    print("=" * 50)
-    print("Tracking: Single RED point = average of all detected pixels")
-    print("=" * 50)
+    # Record raw frames and capture timestamps for replay (--record FILE.frames)
+    if record:
+        cap = RecordingSource(cap, record)
     
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            print("Failed to grab frame")
-            break
-        
-        # Get current trackbar values
-        tracker.get_trackbar_values()
-        
-        # Detect blob and get mask
-        mask = tracker.detect_blob(frame)
-        
-        # Get average position of all white pixels
-        center, area = tracker.get_average_position(mask)
-        
-        # Get movement command
-        command = tracker.get_direction_command(center, frame.shape)
-        
-        # Draw overlay
-        frame = tracker.draw_overlay(frame, center, area, command)
-        
-        # Show frames
-        cv2.imshow('Blob Tracker', frame)
-        
-        # Handle key presses
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
-            break
-        elif key == ord('s'):
-            print(f"\nSaved Settings:")
-            print(f"Lower HSV: {tracker.lower_hsv}")
-            print(f"Upper HSV: {tracker.upper_hsv}")
-            print(f"Min Area: {tracker.min_blob_area}")
-            print(f"Max Area: {tracker.max_blob_area}")
+    # Grab frames on a background thread so we always process the newest one
+    # (video files and fast replays keep every frame instead of dropping)
+    cap = LatestFrameSource(cap, drop_frames=is_live_source(source) or realtime).start()
+    
+    if headless:
+        run_headless(tracker, cap, watcher)
+    else:
+        run_interactive(tracker, cap, preview_fps)
+    
+    stats = cap.stats()
+    print(f"\nFrames captured: {stats['captured']}, dropped: {stats['dropped']}, stale: {stats['stale']}")
     
     cap.release()
-    cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Blob tracker")
+    parser.add_argument("source", nargs="?", default=0,
+                        help="camera index, video file, .frames recording or 'synthetic' (default: 0)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without windows, settings from --settings")
+    parser.add_argument("--settings", default=None,
+                        help=f"settings JSON file (default: {Settings.SETTINGS_FILE})")
+    parser.add_argument("--preview-fps", type=float, default=PREVIEW_FPS,
+                        help=f"preview window refresh rate (default: {PREVIEW_FPS})")
+    parser.add_argument("--record", default=None,
+                        help="record raw frames to this .frames file for replay")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay a .frames recording at its recorded speed")
+    parser.add_argument("--roi", action="store_true",
+                        help="only search a window around the last position while tracking")
+    args = parser.parse_args()
+    main(args.source, headless=args.headless, settings_file=args.settings,
+         preview_fps=args.preview_fps, record=args.record, realtime=args.realtime,
+         roi=args.roi)
\ No newline at end of file
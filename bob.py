@@ -1,26 +1,34 @@
+import argparse
 import cv2
 import numpy as np
 import requests
 import time
 
-class AutonomousBlobTracker:
-    def __init__(self, esp32_ip="192.168.4.1"):
+from capture import LatestFrameSource, is_live_source, open_capture
+from detection import BlobDetection
+from motion import MotionGate
+from prediction import MODELS, CentroidKalman
+from preview import PREVIEW_FPS, PreviewWindow, StaticOverlayCache
+from recording import RecordingSource
+from scheduler import QualityScheduler
+from settings import Settings, SettingsWatcher
+from metrics import Metrics
+from motor_sender import UDP_PORT, make_sender
+from mp_pipeline import run_pipeline
+from multicam import run_multicam
+
+class AutonomousBlobTracker(BlobDetection):
+    def __init__(self, esp32_ip="192.168.4.1", check_connection=True, transport="http",
+                 udp_port=UDP_PORT):
         # ESP32 connection
         self.esp32_ip = esp32_ip
         self.esp32_url = f"http://{esp32_ip}/control"
         
-        # Default HSV color range (Blue)
-        self.lower_hsv = np.array([34, 30, 94])
-        self.upper_hsv = np.array([68, 116, 229])
-        
-        # Blob size limits (in pixels)
-        self.min_blob_area = 500
-        self.max_blob_area = 50000
+        # Color range, size limits, tracking state and detection backends
+        super().__init__()
         
-        # Tracking state
-        self.last_position = None
-        self.frames_lost = 0
-        self.max_frames_lost = 10
+        # Center line and dead zone, pre-rendered per frame size and dead zone
+        self.overlay_cache = StaticOverlayCache()
         
         # Control parameters
         self.dead_zone = 15  # Pixels from center where no movement needed
@@ -31,8 +39,19 @@ class AutonomousBlobTracker:
         self.last_command_time = 0
         self.command_interval = 0.05  # Send commands every 50ms for faster response
         
+        # Optional prediction.CentroidKalman to steer on where the blob will be
+        self.predictor = None
+        
+        # Background sender so round trips never stall the vision loop
+        # (transport "http" for /control requests, "udp" for binary datagrams,
+        # None for no sender when the caller delivers commands itself)
+        self.motor_sender = None
+        if transport is not None:
+            self.motor_sender = make_sender(esp32_ip, transport, udp_port, timeout=0.3)
+        
         # ESP32 connection test
-        self.test_connection()
+        if check_connection:
+            self.test_connection()
         
     def test_connection(self):
         """Test connection to ESP32"""
@@ -47,24 +66,22 @@ class AutonomousBlobTracker:
             print(f"  ESP32 IP should be: {self.esp32_ip}")
         return False
     
-    def send_motor_command(self, speed):
+    def send_motor_command(self, speed, blocking=False):
         """
         Send movement command to ESP32
         speed > 0: Move FORWARD (object is below center)
         speed < 0: Move BACKWARD (object is above center)
         speed = 0: STOP
+        
+        Commands are queued for the background sender and return immediately;
+        a newer speed replaces one that has not been sent yet.
+        Use blocking=True to wait for delivery (e.g. stop on shutdown).
         """
-        try:
-            # Both motors get same speed for linear movement
-            # Send commands in parallel for faster response
-            params_a = {'motor': 'A', 'speed': speed}
-            params_b = {'motor': 'B', 'speed': speed}
-            
-            requests.get(self.esp32_url, params=params_a, timeout=0.3)
-            requests.get(self.esp32_url, params=params_b, timeout=0.3)
-            return True
-        except:
-            return False
+        # Both motors get same speed for linear movement (sent in one request)
+        if blocking:
+            return self.motor_sender.send_now(speed, speed)
+        self.motor_sender.submit(speed, speed)
+        return True
     
     def create_trackbars(self):
         """Create window with trackbars for color adjustment"""
@@ -85,7 +102,7 @@ class AutonomousBlobTracker:
         # Control parameters
         cv2.createTrackbar('Dead Zone', 'Color Adjustments', self.dead_zone, 200, lambda x: None)
         cv2.createTrackbar('Base Speed', 'Color Adjustments', self.base_speed, 255, lambda x: None)
-        cv2.createTrackbar('Min Speed', 'Color Adjustments', 180, 255, lambda x: None)  # New: adjustable minimum speed
+        cv2.createTrackbar('Min Speed', 'Color Adjustments', getattr(self, 'min_motor_speed', 180), 255, lambda x: None)  # New: adjustable minimum speed
         
     def get_trackbar_values(self):
         """Read current trackbar values"""
@@ -96,43 +113,63 @@ class AutonomousBlobTracker:
         v_min = cv2.getTrackbarPos('V Min', 'Color Adjustments')
         v_max = cv2.getTrackbarPos('V Max', 'Color Adjustments')
         
-        self.lower_hsv = np.array([h_min, s_min, v_min])
-        self.upper_hsv = np.array([h_max, s_max, v_max])
-        
-        self.min_blob_area = cv2.getTrackbarPos('Min Area', 'Color Adjustments')
-        self.max_blob_area = cv2.getTrackbarPos('Max Area', 'Color Adjustments')
+        lower_hsv = np.array([h_min, s_min, v_min])
+        upper_hsv = np.array([h_max, s_max, v_max])
+        min_blob_area = cv2.getTrackbarPos('Min Area', 'Color Adjustments')
+        max_blob_area = cv2.getTrackbarPos('Max Area', 'Color Adjustments')
+        
+        changed = (not np.array_equal(lower_hsv, self.lower_hsv)
+                   or not np.array_equal(upper_hsv, self.upper_hsv)
+                   or min_blob_area != self.min_blob_area
+                   or max_blob_area != self.max_blob_area)
+        self.lower_hsv = lower_hsv
+        self.upper_hsv = upper_hsv
+        self.min_blob_area = min_blob_area
+        self.max_blob_area = max_blob_area
+        
+        # Changed detection settings force a new detection, like apply_config
+        if changed and self.motion_gate is not None:
+            self.motion_gate.reset()
         self.dead_zone = cv2.getTrackbarPos('Dead Zone', 'Color Adjustments')
         self.base_speed = cv2.getTrackbarPos('Base Speed', 'Color Adjustments')
         self.min_motor_speed = cv2.getTrackbarPos('Min Speed', 'Color Adjustments')  # Read minimum speed
     
-    def detect_blob(self, frame):
-        """Detect the colored blob in the frame"""
-        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
-        mask = cv2.inRange(hsv, self.lower_hsv, self.upper_hsv)
-        
-        # Remove noise
-        kernel = np.ones((5, 5), np.uint8)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, kernel)
-        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, kernel)
-        
-        return mask
+    def apply_config(self, config):
+        """Apply an immutable TrackerConfig snapshot (headless mode)"""
+        self.lower_hsv = np.array(config.lower_hsv)
+        self.upper_hsv = np.array(config.upper_hsv)
+        self.min_blob_area = config.min_blob_area
+        self.max_blob_area = config.max_blob_area
+        self.dead_zone = config.dead_zone
+        self.noise_filter = config.noise_filter
+        self.blob_selection = config.blob_selection
+        self.roi_tracking = config.roi_tracking
+        self.base_speed = config.base_speed
+        self.min_motor_speed = config.min_speed
+        if self.motion_gate is not None:
+            self.motion_gate.reset()
     
-    def get_average_position(self, mask):
-        """Calculate average position of all white pixels"""
-        y_coords, x_coords = np.where(mask == 255)
-        
-        if len(x_coords) == 0 or len(y_coords) == 0:
-            return None, 0
-        
-        area = len(x_coords)
+    def predict_center(self, center, capture_timestamp, frame_shape):
+        """
+        Where the blob will be when the next motor command takes effect
         
-        if area < self.min_blob_area or area > self.max_blob_area:
-            return None, 0
+        Without a predictor the detected center is returned unchanged. Otherwise
+        the filter is updated (coasting through missed frames) and extrapolated
+        over the measured latency: time since capture, the wait for the next
+        command slot and the one-way Wi-Fi delay.
+        """
+        if self.predictor is None:
+            return center
+        if self.predictor.update(center, capture_timestamp) is None:
+            return None
         
-        avg_x = int(np.mean(x_coords))
-        avg_y = int(np.mean(y_coords))
+        wait = max(0.0, self.last_command_time + self.command_interval - time.time())
+        delivery = time.monotonic() + wait + self.motor_sender.expected_delivery()
+        x, y = self.predictor.predict(delivery)
         
-        return (avg_x, avg_y), area
+        # Keep the prediction on screen
+        height, width = frame_shape[:2]
+        return min(max(x, 0), width - 1), min(max(y, 0), height - 1)
     
     def calculate_motor_speed(self, center, frame_shape):
         """
@@ -175,19 +212,27 @@ class AutonomousBlobTracker:
             # Object is ABOVE center → Move BACKWARD
             return -speed, f"BACKWARD {speed} - Object above (Err: {error_y}px)"
     
-    def draw_overlay(self, frame, center, area, command, motor_speed):
-        """Draw tracking information on frame"""
-        height, width = frame.shape[:2]
+    def draw_static_overlay(self, layer):
+        """Draw the elements that only change with frame size and dead zone"""
+        height, width = layer.shape[:2]
         frame_center_y = height // 2
         
         # Draw horizontal center line
-        cv2.line(frame, (0, frame_center_y), (width, frame_center_y), (255, 255, 255), 2)
+        cv2.line(layer, (0, frame_center_y), (width, frame_center_y), (255, 255, 255), 2)
         
         # Draw dead zone (horizontal band)
-        cv2.rectangle(frame, 
+        cv2.rectangle(layer, 
                      (0, frame_center_y - self.dead_zone), 
                      (width, frame_center_y + self.dead_zone), 
                      (200, 200, 200), 1)
+    
+    def draw_overlay(self, frame, center, area, command, motor_speed):
+        """Draw tracking information on frame"""
+        height, width = frame.shape[:2]
+        frame_center_y = height // 2
+        
+        # Center line and dead zone come from the cached static layer
+        self.overlay_cache.apply(frame, self.dead_zone, self.draw_static_overlay)
         
         if center:
             # Draw RED circle at average position
@@ -219,7 +264,10 @@ class AutonomousBlobTracker:
         
         return frame
 
-def main():
+def main(source=0, headless=False, settings_file=None, esp32_ip=None, pipeline=False,
+         metrics_port=None, metrics_interval=None, preview_fps=PREVIEW_FPS, predict=None,
+         adaptive=False, motion_gate=False, record=None, realtime=False, transport="http",
+         udp_port=UDP_PORT, multicam=None, max_skew=0.05, roi=False):
     print("=" * 60)
     print("AUTONOMOUS BLOB TRACKER WITH ESP32 CONTROL")
     print("=" * 60)
@@ -229,26 +277,72 @@ def main():
     print("3. Password: '12345678'")
     print("4. ESP32 IP Address: 192.168.4.1")
     print("\n🎮 CONTROLS:")
-    print("  - Adjust trackbars to tune color detection")
-    print("  - 'q' - Quit program")
-    print("  - 's' - Save current settings")
-    print("  - SPACE - Emergency stop")
+    if headless:
+        print("  - Headless: edit the settings file to tune (reloaded on change)")
+        print("  - Ctrl+C - Stop motors and quit")
+    else:
+        print("  - Adjust trackbars to tune color detection")
+        print("  - 'q' - Quit program")
+        print("  - 's' - Save current settings")
+        print("  - SPACE - Emergency stop")
     print("\n🤖 TRACKING MODE:")
     print("  - Object ABOVE center → Motors move BACKWARD")
     print("  - Object BELOW center → Motors move FORWARD")
     print("  - Object in dead zone → Motors STOP")
     print("=" * 60)
     
-    esp32_ip = input("\nEnter ESP32 IP address (default: 192.168.4.1): ").strip()
+    if esp32_ip is None and not headless:
+        esp32_ip = input("\nEnter ESP32 IP address (default: 192.168.4.1): ").strip()
     if not esp32_ip:
         esp32_ip = "192.168.4.1"
     
     # Initialize tracker
-    tracker = AutonomousBlobTracker(esp32_ip)
-    tracker.create_trackbars()
+    tracker = AutonomousBlobTracker(esp32_ip, transport=transport, udp_port=udp_port)
+    if roi:
+        # A settings file's roi_tracking still takes precedence
+        tracker.roi_tracking = True
+    if transport == "udp":
+        print(f"✓ Motor commands over UDP port {udp_port}")
+    watcher = None
+    if headless:
+        # No windows: configuration comes from the hot-reloaded settings file
+        # (keys it leaves out keep this tracker's defaults)
+        watcher = SettingsWatcher(settings_file, defaults=Settings.settings_from_tracker(tracker))
+        if watcher.config is not None:
+            tracker.apply_config(watcher.config)
+        else:
+            print(f"⚠ Settings file not found: {watcher.filename} - using defaults until it appears")
+    else:
+        if settings_file:
+            Settings.load_settings(tracker, settings_file)
+    
+    if pipeline:
+        # Capture, detection, control and preview in separate processes
+        # (settings are fixed for the run; trackbars are not available)
+        tracker.motor_sender.stop()
+        run_pipeline(source, esp32_ip, Settings.config_from_tracker(tracker), render=not headless,
+                     transport=transport, udp_port=udp_port)
+        return
+    
+    if multicam:
+        # One capture + detection process per camera, steering on the fused target
+        tracker.motor_sender.stop()
+        run_multicam(multicam, esp32_ip, Settings.config_from_tracker(tracker), max_skew=max_skew,
+                     realtime=realtime, transport=transport, udp_port=udp_port)
+        return
+    
+    if predict:
+        # Steer on the predicted position at command delivery time
+        tracker.predictor = CentroidKalman(predict)
+        print(f"✓ Predictive tracking: constant-{predict} Kalman filter")
     
-    # Open camera
-    cap = cv2.VideoCapture(0)
+    if motion_gate:
+        # Skip detection while the scene is static (parked rover)
+        tracker.motion_gate = MotionGate()
+        print("✓ Motion gate: reusing detections on unchanged frames")
+    
+    # Open camera (0 for default camera, video file path, or 'synthetic')
+    cap = open_capture(source, realtime=realtime)
     
     if not cap.isOpened():
         print("❌ Error: Could not open camera")
@@ -259,51 +353,137 @@ def main():
     cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     cap.set(cv2.CAP_PROP_FPS, 30)
     
+    # Record raw frames and capture timestamps for replay (--record FILE.frames)
+    if record:
+        cap = RecordingSource(cap, record)
+    
+    # Grab frames on a background thread so we always steer on the newest one
+    # (fast replays keep every frame for deterministic runs)
+    cap = LatestFrameSource(cap, drop_frames=is_live_source(source) or realtime).start()
+    
+    # Instrumentation (no-op unless an endpoint or console summary is requested)
+    metrics = Metrics(enabled=metrics_port is not None or metrics_interval is not None)
+    if metrics.enabled:
+        tracker.motor_sender.on_result = metrics.command_result
+        if metrics_port is not None:
+            metrics.serve(metrics_port)
+            print(f"✓ Metrics at http://127.0.0.1:{metrics_port}/metrics")
+    
+    # Overlay, imshow/waitKey and trackbars run on the main thread (required by
+    # HighGUI on macOS) at a lower rate; the tracking loop then runs on a worker
+    # thread, so control latency does not depend on the preview
+    preview = None
+    if not headless:
+        preview = PreviewWindow('Autonomous Blob Tracker', tracker.draw_overlay, preview_fps,
+                                setup=tracker.create_trackbars,
+                                poll=tracker.get_trackbar_values,
+                                metrics=metrics if metrics.enabled else None)
+    
     print("\n✓ Camera opened successfully")
     print("✓ System ready - Starting autonomous tracking...\n")
     
-    try:
-        while True:
-            ret, frame = cap.read()
-            if not ret:
+    # Optional deadline scheduler: one frame of work must fit in a command interval
+    scheduler = None
+    if adaptive:
+        scheduler = QualityScheduler(budget=tracker.command_interval)
+        print(f"✓ Adaptive quality: {tracker.command_interval * 1000:.0f}ms frame budget")
+    
+    def tracking_loop():
+        last_summary = time.time()
+        frames_since_report = 0
+        report_time = time.time()
+        center, area = None, 0
+        preview_time = 0.0  # Preview render time already charged to a frame
+        while preview is None or preview.running:
+            # Time spent waiting for the next frame (capture runs on its own
+            # thread; its age is part of the camera-to-command latency)
+            with metrics.stage("wait"):
+                captured = cap.read_latest(timeout=5.0)
+            if captured is None:
                 print("Failed to grab frame")
                 break
+            frame = captured.frame
+            frame_start = time.perf_counter()
             
-            # Get current trackbar values
-            tracker.get_trackbar_values()
-            
-            # Detect blob and get mask
-            mask = tracker.detect_blob(frame)
+            if headless:
+                # Cheap mtime check; apply the new snapshot only when it changed
+                config = watcher.poll()
+                if config is not None:
+                    tracker.apply_config(config)
+                    print(f"✓ Settings v{config.version} applied")
             
-            # Get average position of all white pixels
-            center, area = tracker.get_average_position(mask)
+            # At the lowest quality level detection only runs on every 2nd frame
+            skipped = scheduler is not None and scheduler.skip_frame()
+            if not skipped:
+                # Detect blob and get average position of all white pixels
+                # (with --roi, only around the last position while tracking)
+                with metrics.stage("detect"):
+                    center, area = tracker.track(frame)
             
+            with metrics.stage("control"):
+                # Compensate for latency (no-op unless --predict is set); on
+                # skipped frames the predictor coasts, otherwise the last
+                # detection is reused
+                if skipped and tracker.predictor is None:
+                    steer_center = center
+                else:
+                    steer_center = tracker.predict_center(None if skipped else center,
+                                                          captured.timestamp, frame.shape)
+                
+                # Calculate motor speed and command
+                motor_speed, command = tracker.calculate_motor_speed(steer_center, frame.shape)
+                
+                # Send command to ESP32 (with rate limiting)
+                current_time = time.time()
+                if current_time - tracker.last_command_time >= tracker.command_interval:
+                    if tracker.send_motor_command(motor_speed):
+                        tracker.last_command_time = current_time
             
-            # Calculate motor speed and command
-            motor_speed, command = tracker.calculate_motor_speed(center, frame.shape)
+            if scheduler is not None:
+                # The preview renders on the main thread, outside this loop;
+                # its render time since the last frame counts towards this
+                # frame, so dropping the preview shows up in the frame time
+                frame_time = time.perf_counter() - frame_start
+                if preview is not None:
+                    frame_time += preview.render_time - preview_time
+                    preview_time = preview.render_time
+                if scheduler.observe(frame_time):
+                    scheduler.apply(tracker)
             
-            # Send command to ESP32 (with rate limiting)
-            current_time = time.time()
-            if current_time - tracker.last_command_time >= tracker.command_interval:
-                if tracker.send_motor_command(motor_speed):
-                    tracker.last_command_time = current_time
+            if metrics.enabled:
+                metrics.frame_done(captured.timestamp)
+                metrics.set_dropped_frames(cap.frames_dropped)
+                if tracker.motion_gate is not None:
+                    metrics.set_counter("motion_gate_hits", tracker.motion_gate.hits)
+                    metrics.set_counter("motion_gate_misses", tracker.motion_gate.misses)
+                if metrics_interval and current_time - last_summary >= metrics_interval:
+                    print(metrics.summary())
+                    last_summary = current_time
             
-            # Draw overlay
-            frame = tracker.draw_overlay(frame, center, area, command, motor_speed)
+            if headless:
+                # Periodic status line instead of a preview window
+                frames_since_report += 1
+                if current_time - report_time >= 1.0:
+                    fps = frames_since_report / (current_time - report_time)
+                    print(f"{fps:5.1f} fps | {command}")
+                    frames_since_report = 0
+                    report_time = current_time
+                continue
             
-            # Show frames
-            cv2.imshow('Autonomous Blob Tracker', frame)
-            # cv2.imshow('Mask', mask)
+            # Overlay and display happen on the main thread at preview_fps
+            # (the scheduler turns the preview off first when time is short)
+            if scheduler is None or scheduler.preview_enabled:
+                preview.submit(frame, center, area, command, motor_speed)
             
             # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
+            key = preview.read_key()
             if key == ord('q'):
                 print("\nStopping motors and exiting...")
-                tracker.send_motor_command(0)
+                tracker.send_motor_command(0, blocking=True)
                 break
             elif key == ord(' '):  # Emergency stop
                 print("\n⚠️ EMERGENCY STOP!")
-                tracker.send_motor_command(0)
+                tracker.send_motor_command(0, blocking=True)
             elif key == ord('s'):
                 print(f"\n💾 Saved Settings:")
                 print(f"Lower HSV: {tracker.lower_hsv}")
@@ -313,16 +493,80 @@ def main():
                 print(f"Dead Zone: {tracker.dead_zone}")
                 print(f"Base Speed: {tracker.base_speed}")
     
+    try:
+        if preview is None:
+            tracking_loop()
+        else:
+            preview.run(tracking_loop)
     except KeyboardInterrupt:
         print("\n\n⚠️ Keyboard interrupt - Stopping motors...")
-        tracker.send_motor_command(0)
+        tracker.send_motor_command(0, blocking=True)
     
     finally:
         # Clean shutdown
-        tracker.send_motor_command(0)
+        tracker.send_motor_command(0, blocking=True)
+        tracker.motor_sender.stop()
+        stats = cap.stats()
+        print(f"Frames captured: {stats['captured']}, dropped: {stats['dropped']}, stale: {stats['stale']}")
+        sender_stats = tracker.motor_sender.stats()
+        print(f"Motor commands sent: {sender_stats['sent']}, failed: {sender_stats['failed']}, "
+              f"coalesced: {sender_stats['coalesced']}, avg latency: {sender_stats['avg_latency_ms']:.1f}ms")
+        if "stale" in sender_stats:
+            print(f"UDP datagrams: {sender_stats['datagrams']}, lost: {sender_stats['loss_rate']:.1%}, "
+                  f"dropped as out-of-order: {sender_stats['stale']}")
+        if tracker.motion_gate is not None:
+            gate_stats = tracker.motion_gate.stats()
+            print(f"Motion gate: {gate_stats['hits']} frames reused, {gate_stats['misses']} detected "
+                  f"({gate_stats['hit_rate']:.0%} of detections skipped)")
+        if metrics.enabled:
+            print(metrics.summary())
+        metrics.close()
         cap.release()
-        cv2.destroyAllWindows()
         print("✓ System shutdown complete")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Autonomous blob tracker with ESP32 control")
+    parser.add_argument("source", nargs="?", default=0,
+                        help="camera index, video file, .frames recording or 'synthetic' (default: 0)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without windows, settings from --settings")
+    parser.add_argument("--settings", default=None,
+                        help=f"settings JSON file (default: {Settings.SETTINGS_FILE})")
+    parser.add_argument("--pipeline", action="store_true",
+                        help="run capture/detect/control/render in separate processes")
+    parser.add_argument("--esp32-ip", default=None,
+                        help="ESP32 address (prompted for when omitted in windowed mode)")
+    parser.add_argument("--metrics-port", type=int, default=None,
+                        help="serve Prometheus-style metrics on this port (/metrics)")
+    parser.add_argument("--metrics-interval", type=float, default=None,
+                        help="print a metrics summary every N seconds")
+    parser.add_argument("--preview-fps", type=float, default=PREVIEW_FPS,
+                        help=f"preview window refresh rate (default: {PREVIEW_FPS})")
+    parser.add_argument("--predict", choices=sorted(MODELS), default=None,
+                        help="steer on a Kalman-predicted position to compensate for latency")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="lower preview/detection quality to keep within the command interval")
+    parser.add_argument("--motion-gate", action="store_true",
+                        help="reuse the last detection while the scene is unchanged")
+    parser.add_argument("--record", default=None,
+                        help="record raw frames to this .frames file for replay")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay a .frames recording at its recorded speed")
+    parser.add_argument("--transport", choices=["http", "udp"], default="http",
+                        help="motor command transport (default: http)")
+    parser.add_argument("--udp-port", type=int, default=UDP_PORT,
+                        help=f"ESP32 UDP control port (default: {UDP_PORT})")
+    parser.add_argument("--multicam", nargs="+", default=None, metavar="SOURCE",
+                        help="track with several cameras (one process each) and steer on the fused target")
+    parser.add_argument("--max-skew", type=float, default=0.05,
+                        help="oldest camera result (seconds) still fused with --multicam (default: 0.05)")
+    parser.add_argument("--roi", action="store_true",
+                        help="only search a window around the last position while tracking")
+    args = parser.parse_args()
+    main(args.source, headless=args.headless, settings_file=args.settings,
+         esp32_ip=args.esp32_ip, pipeline=args.pipeline,
+         metrics_port=args.metrics_port, metrics_interval=args.metrics_interval,
+         preview_fps=args.preview_fps, predict=args.predict, adaptive=args.adaptive,
+         motion_gate=args.motion_gate, record=args.record, realtime=args.realtime,
+         transport=args.transport, udp_port=args.udp_port, multicam=args.multicam,
+         max_skew=args.max_skew, roi=args.roi)
\ No newline at end of file
@@ -0,0 +1,253 @@
+"""
+Frame capture sources for Blob Tracker
+Threaded latest-frame capture so slow processing never steers on old frames
+"""
+
+import threading
+import time
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+from recording import ReplaySource, is_recording
+
+# One captured frame with its capture time (time.monotonic) and sequence number
+CapturedFrame = namedtuple("CapturedFrame", ["frame", "timestamp", "seq"])
+
+
+def make_synthetic_frame(width, height, center, radius, hsv_color=(50, 80, 160),
+                         noise=8, rng=None):
+    """Render a noisy background with one filled circle of the given HSV color"""
+    if rng is None:
+        rng = np.random.default_rng(0)
+
+    # Dark grey background with gaussian noise
+    frame = np.full((height, width, 3), 40, np.uint8)
+    if noise > 0:
+        grain = rng.normal(0, noise, (height, width, 3))
+        frame = np.clip(frame + grain, 0, 255).astype(np.uint8)
+
+    # Convert the blob color to BGR once so the mask matches the HSV range exactly
+    hsv_pixel = np.uint8([[hsv_color]])
+    bgr = cv2.cvtColor(hsv_pixel, cv2.COLOR_HSV2BGR)[0, 0]
+    if center is not None:
+        cv2.circle(frame, (int(center[0]), int(center[1])), int(radius),
+                   tuple(int(c) for c in bgr), -1)
+
+    return frame
+
+
+class SyntheticSource:
+    """
+    Camera stand-in that produces a blob moving on a circular path
+    Mimics the parts of cv2.VideoCapture used by the trackers
+    """
+
+    def __init__(self, width=640, height=480, fps=30, radius=40,
+                 hsv_color=(50, 80, 160), num_frames=None, seed=0):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.radius = radius
+        self.hsv_color = hsv_color
+        self.num_frames = num_frames
+        self.frame_index = 0
+        self.opened = True
+        self.rng = np.random.default_rng(seed)
+        self.next_frame_time = time.monotonic()
+
+    def blob_position(self, index):
+        """Blob center for a given frame index"""
+        angle = index * 2 * np.pi / 120.0
+        cx = self.width / 2 + self.width * 0.3 * np.cos(angle)
+        cy = self.height / 2 + self.height * 0.3 * np.sin(angle)
+        return int(cx), int(cy)
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if not self.opened:
+            return False, None
+        if self.num_frames is not None and self.frame_index >= self.num_frames:
+            return False, None
+
+        # Pace output like a real camera (fps=0 means as fast as possible)
+        if self.fps:
+            delay = self.next_frame_time - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            self.next_frame_time = max(self.next_frame_time, time.monotonic()) + 1.0 / self.fps
+
+        center = self.blob_position(self.frame_index)
+        frame = make_synthetic_frame(self.width, self.height, center, self.radius,
+                                     self.hsv_color, rng=self.rng)
+        self.frame_index += 1
+        return True, frame
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+        elif prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+        elif prop == cv2.CAP_PROP_FPS:
+            self.fps = value
+        else:
+            return False
+        return True
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width)
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height)
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps)
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.num_frames or 0)
+        return 0.0
+
+    def release(self):
+        self.opened = False
+
+
+def open_capture(source=0, realtime=False):
+    """
+    Open a capture object from a camera index, video file path, frame
+    recording (.frames, see recording.py) or 'synthetic'
+    Returns an object with the cv2.VideoCapture read/isOpened/release API
+    Recordings replay as fast as possible unless realtime is set
+    """
+    if source == "synthetic":
+        return SyntheticSource()
+    if is_recording(source):
+        return ReplaySource(source, realtime=realtime)
+    if isinstance(source, str) and source.isdigit():
+        source = int(source)
+    return cv2.VideoCapture(source)
+
+
+def is_live_source(source):
+    """True for cameras and synthetic sources, False for video files and recordings"""
+    if isinstance(source, str):
+        return source == "synthetic" or source.isdigit()
+    return True
+
+
+class LatestFrameSource:
+    """
+    Reads a capture object on a background thread and keeps only the newest frames
+
+    The ring buffer holds at most buffer_size frames. When the consumer is
+    slower than the camera, older frames are overwritten and counted as dropped,
+    so read() always returns the most recent frame instead of a queued one.
+    Set drop_frames=False for video files where every frame should be processed.
+    """
+
+    def __init__(self, capture, buffer_size=2, drop_frames=True, stale_after=0.1):
+        self.capture = capture
+        self.stale_after = stale_after  # Frames older than this (seconds) count as stale
+        self.buffer = deque(maxlen=buffer_size)
+        self.drop_frames = drop_frames
+        self.condition = threading.Condition()
+        self.thread = None
+        self.running = False
+        self.finished = False
+
+        # Counters
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.stale_reads = 0
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def start(self):
+        """Start the capture thread"""
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def _capture_loop(self):
+        seq = 0
+        while self.running:
+            ret, frame = self.capture.read()
+            timestamp = time.monotonic()
+            if not ret:
+                break
+
+            with self.condition:
+                # Without dropping, wait until the consumer has made room
+                if not self.drop_frames:
+                    while self.running and len(self.buffer) == self.buffer.maxlen:
+                        self.condition.wait(0.1)
+                elif len(self.buffer) == self.buffer.maxlen:
+                    self.frames_dropped += 1
+
+                self.buffer.append(CapturedFrame(frame, timestamp, seq))
+                self.frames_captured += 1
+                self.condition.notify_all()
+            seq += 1
+
+        with self.condition:
+            self.finished = True
+            self.condition.notify_all()
+
+    def read_latest(self, timeout=1.0):
+        """
+        Return the newest CapturedFrame, or None when the source has ended
+        Frames older than the newest one are discarded and counted as dropped
+        """
+        deadline = time.monotonic() + timeout
+        with self.condition:
+            while not self.buffer:
+                remaining = deadline - time.monotonic()
+                if self.finished or remaining <= 0:
+                    return None
+                self.condition.wait(remaining)
+
+            if self.drop_frames:
+                captured = self.buffer.pop()
+                self.frames_dropped += len(self.buffer)
+                self.buffer.clear()
+            else:
+                captured = self.buffer.popleft()
+            self.condition.notify_all()
+
+        if time.monotonic() - captured.timestamp > self.stale_after:
+            self.stale_reads += 1
+        return captured
+
+    def read(self):
+        """cv2.VideoCapture compatible read returning (ret, frame)"""
+        if self.thread is None:
+            self.start()
+        captured = self.read_latest(timeout=5.0)
+        if captured is None:
+            return False, None
+        return True, captured.frame
+
+    def stats(self):
+        """Capture counters"""
+        return {
+            "captured": self.frames_captured,
+            "dropped": self.frames_dropped,
+            "stale": self.stale_reads,
+        }
+
+    def release(self):
+        self.running = False
+        with self.condition:
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+        self.capture.release()
@@ -0,0 +1,52 @@
+"""
+Centroid engine for Blob Tracker masks
+Reads blob area and average position from running row/column sums
+"""
+
+import cv2
+import numpy as np
+
+
+def mask_sums(mask):
+    """
+    Pixel count and coordinate sums (area, sum_x, sum_y) of a 0/255 mask
+
+    The mask is reduced to one column-sum row and one row-sum column, and the
+    coordinate sums are dot products of those with the pixel indices, so no
+    per-pixel coordinate arrays are ever built.
+    """
+    column_sums = cv2.reduce(mask, 0, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+    row_sums = cv2.reduce(mask, 1, cv2.REDUCE_SUM, dtype=cv2.CV_32S).ravel()
+
+    # White pixels are 255, so every sum is 255 times the pixel count
+    area = int(column_sums.sum()) // 255
+    sum_x = int(np.dot(column_sums, np.arange(column_sums.size, dtype=np.int64))) // 255
+    sum_y = int(np.dot(row_sums, np.arange(row_sums.size, dtype=np.int64))) // 255
+
+    return area, sum_x, sum_y
+
+
+def centroid_from_sums(area, sum_x, sum_y, min_area, max_area):
+    """Apply the blob size limits and turn the sums into ((x, y), area)"""
+    # Check if any white pixels exist
+    if area == 0:
+        return None, 0
+
+    # Check if area is within bounds
+    if area < min_area or area > max_area:
+        return None, 0
+
+    # Average position, truncated like int(np.mean(coords))
+    return (int(sum_x / area), int(sum_y / area)), area
+
+
+def mask_centroid(mask, min_area, max_area):
+    """
+    Average position and pixel count of the white pixels in a 0/255 mask
+
+    Gives the same result as taking np.mean of the np.where(mask == 255)
+    coordinates. Returns ((x, y), area), or (None, 0) when the mask is empty
+    or the area is outside [min_area, max_area].
+    """
+    area, sum_x, sum_y = mask_sums(mask)
+    return centroid_from_sums(area, sum_x, sum_y, min_area, max_area)
@@ -0,0 +1,107 @@
+"""
+BGR lookup-table thresholding for Blob Tracker
+Builds the HSV threshold result for every BGR color once per threshold change,
+then produces masks straight from BGR frames without a per-frame HSV conversion
+
+Experimental: on this tree the table gather is slower than cvtColor + inRange
+(0.5-0.7x in benchmarks.py), and below 8 bits it is not exact.
+"""
+
+import cv2
+import numpy as np
+
+from pipeline import in_hsv_range
+
+
+class BgrMaskLut:
+    """
+    Maps BGR pixels directly to 0/255 mask values
+
+    The table is evaluated on a quantized BGR grid of (2**bits)^3 bins, using
+    the bin center color, and is rebuilt only when lower_hsv/upper_hsv change.
+    bits=8 gives an exact table (every BGR color converted). Per frame, each
+    pixel is packed into a 24-bit index and looked up in a single gather pass,
+    which is slower than OpenCV's vectorized cvtColor + inRange.
+    """
+
+    def __init__(self, bits=6):
+        if not 1 <= bits <= 8:
+            raise ValueError("bits must be between 1 and 8")
+        self.bits = bits
+        self.table = None
+        self.thresholds = None
+        self.builds = 0
+
+        # Per-shape scratch buffers (packed BGRx pixels and output mask)
+        self.packed = None
+        self.mask = None
+
+    def update(self, lower_hsv, upper_hsv):
+        """Rebuild the table if the thresholds changed; returns True on rebuild"""
+        thresholds = (tuple(int(v) for v in lower_hsv), tuple(int(v) for v in upper_hsv))
+        if thresholds == self.thresholds:
+            return False
+
+        levels = 1 << self.bits
+        step = 256 // levels
+
+        # Bin center colors laid out as an image so cvtColor converts them all at once
+        centers = (np.arange(levels) * step + step // 2).astype(np.uint8)
+        r, g, b = np.meshgrid(centers, centers, centers, indexing="ij")
+        grid = np.stack([b, g, r], axis=-1).reshape(levels * levels, levels, 3)
+
+        hsv = cv2.cvtColor(grid, cv2.COLOR_BGR2HSV)
+        binned = in_hsv_range(hsv, thresholds[0], thresholds[1],
+                              np.empty(hsv.shape[:2], np.uint8), np.empty(hsv.shape[:2], np.uint8))
+        binned = binned.reshape(levels, levels, levels)
+
+        # Expand bins to the full 256^3 table indexed by r << 16 | g << 8 | b
+        if step > 1:
+            binned = binned.repeat(step, axis=0).repeat(step, axis=1).repeat(step, axis=2)
+        self.table = np.ascontiguousarray(binned).reshape(-1)
+
+        self.thresholds = thresholds
+        self.builds += 1
+        return True
+
+    def share_table(self, other):
+        """Use other's table without rebuilding it (buffers stay separate)"""
+        if other.bits != self.bits:
+            raise ValueError("Tables can only be shared between LUTs with the same bits")
+        self.table = other.table
+        self.thresholds = other.thresholds
+
+    def apply(self, frame, lower_hsv, upper_hsv):
+        """Threshold a BGR frame; same output format as cv2.inRange on HSV"""
+        self.update(lower_hsv, upper_hsv)
+
+        height, width = frame.shape[:2]
+        if self.packed is None or self.packed.shape[:2] != (height, width):
+            # Fourth byte stays zero so each pixel reads as b | g << 8 | r << 16
+            self.packed = np.zeros((height, width, 4), np.uint8)
+            self.mask = np.empty((height, width), np.uint8)
+
+        cv2.mixChannels([frame], [self.packed], [0, 0, 1, 1, 2, 2])
+        index = self.packed.view(np.uint32)[..., 0]
+        return np.take(self.table, index, out=self.mask)
+
+
+def lut_accuracy(lut, lower_hsv, upper_hsv, frames):
+    """
+    Agreement between the LUT mask and the full HSV path
+    Returns (fraction of pixels that agree, false positives, false negatives)
+    """
+    total = 0
+    false_positive = 0
+    false_negative = 0
+    for frame in frames:
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+        reference = in_hsv_range(hsv, lower_hsv, upper_hsv, np.empty(hsv.shape[:2], np.uint8),
+                                 np.empty(hsv.shape[:2], np.uint8))
+        result = lut.apply(frame, lower_hsv, upper_hsv)
+        false_positive += int(np.count_nonzero((result > 0) & (reference == 0)))
+        false_negative += int(np.count_nonzero((result == 0) & (reference > 0)))
+        total += reference.size
+
+    agreement = 1.0 - (false_positive + false_negative) / total
+    return agreement, false_positive, false_negative
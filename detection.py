@@ -0,0 +1,437 @@
+"""
+Shared blob detection for BlobTracker and AutonomousBlobTracker
+One detect / locate / track implementation over pluggable thresholding
+backends: OpenCV HSV, a BGR lookup table, or a fused Numba kernel
+"""
+
+import threading
+
+import numpy as np
+
+from blobs import BlobLabeller
+from centroid import centroid_from_sums
+from color_lut import BgrMaskLut
+from noise_filter import make_filter
+from pipeline import MORPH_KERNEL, FramePipeline
+from pyramid import SCALED_KERNEL, choose_scale, scaled_centroid
+from roi import roi_window
+from tiling import TiledDetector
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # Optional: only the "numba" backend needs it
+    njit = None
+
+NUMBA_AVAILABLE = njit is not None
+
+# Names accepted by BlobDetection.threshold_backend
+BACKENDS = ("hsv", "lut", "numba")
+
+# Fixed-point precision of OpenCV's 8-bit BGR to HSV conversion
+HSV_SHIFT = 12
+
+# Numba's workqueue threading layer aborts on concurrent parallel calls, so
+# tiled detection takes turns; each call already runs its rows on every core
+NUMBA_LOCK = threading.Lock()
+
+
+def hsv_division_tables():
+    """
+    OpenCV's reciprocal tables for 8-bit BGR to HSV (saturation, hue)
+    Entry i is round((255 << 12) / i) and round((180 << 12) / (6 * i)), 0 for i = 0
+    """
+    values = np.arange(256, dtype=np.float64)
+    values[0] = np.inf
+    saturation = np.rint((255 << HSV_SHIFT) / values).astype(np.int32)
+    hue = np.rint((180 << HSV_SHIFT) / (6.0 * values)).astype(np.int32)
+    return saturation, hue
+
+
+if NUMBA_AVAILABLE:
+
+    @njit(inline="always")
+    def _in_hsv_range(b, g, r, lower, upper, wrap, sdiv, hdiv):
+        """OpenCV's BGR2HSV for one pixel followed by the inRange test"""
+        v = max(b, g, r)
+        if v < lower[2] or v > upper[2]:
+            return False
+        diff = v - min(b, g, r)
+        s = (diff * sdiv[v] + (1 << (HSV_SHIFT - 1))) >> HSV_SHIFT
+        if s < lower[1] or s > upper[1]:
+            return False
+        if v == r:
+            h = g - b
+        elif v == g:
+            h = b - r + 2 * diff
+        else:
+            h = r - g + 4 * diff
+        h = (h * hdiv[diff] + (1 << (HSV_SHIFT - 1))) >> HSV_SHIFT
+        if h < 0:
+            h += 180
+        if wrap:
+            return h >= lower[0] or h <= upper[0]
+        return lower[0] <= h <= upper[0]
+
+    @njit(parallel=True, cache=True)
+    def _threshold_kernel(image, lower, upper, wrap, sdiv, hdiv, mask):
+        """0/255 mask in one pass over the BGR pixels (rows in parallel)"""
+        height, width = mask.shape
+        for y in prange(height):
+            for x in range(width):
+                inside = _in_hsv_range(np.int32(image[y, x, 0]), np.int32(image[y, x, 1]),
+                                       np.int32(image[y, x, 2]), lower, upper, wrap, sdiv, hdiv)
+                mask[y, x] = 255 if inside else 0
+
+    @njit(parallel=True, cache=True)
+    def _threshold_sums_kernel(image, lower, upper, wrap, sdiv, hdiv, row_area, row_sum_x):
+        """Per-row pixel counts and x sums of the in-range pixels; no mask is written"""
+        height, width = image.shape[:2]
+        for y in prange(height):
+            area = 0
+            sum_x = 0
+            for x in range(width):
+                if _in_hsv_range(np.int32(image[y, x, 0]), np.int32(image[y, x, 1]),
+                                 np.int32(image[y, x, 2]), lower, upper, wrap, sdiv, hdiv):
+                    area += 1
+                    sum_x += x
+            row_area[y] = area
+            row_sum_x[y] = sum_x
+
+
+class HsvBackend:
+    """cvtColor + inRange into the pipeline's preallocated buffers (default)"""
+
+    name = "hsv"
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+
+    def mask(self, image, lower_hsv, upper_hsv):
+        return self.pipeline.threshold(image, lower_hsv, upper_hsv)
+
+    def sums(self, image, lower_hsv, upper_hsv):
+        """(area, sum_x, sum_y) of the thresholded image, without noise removal"""
+        return self.pipeline.sums(self.mask(image, lower_hsv, upper_hsv))
+
+
+class LutBackend(HsvBackend):
+    """
+    Mask straight from BGR through color_lut.BgrMaskLut (no HSV conversion)
+
+    Experimental, not a speedup: slower than HsvBackend here and, with the
+    default 6-bit table, not exact.
+    """
+
+    name = "lut"
+
+    def __init__(self, pipeline, lut):
+        super().__init__(pipeline)
+        self.lut = lut
+
+    def mask(self, image, lower_hsv, upper_hsv):
+        return self.lut.apply(image, lower_hsv, upper_hsv)
+
+
+class NumbaBackend(HsvBackend):
+    """
+    Fused JIT kernel: HSV conversion, range test and centroid sums in one pass
+
+    The kernel reproduces OpenCV's fixed-point 8-bit conversion, so its masks
+    match the hsv backend bit for bit, and rows run in parallel on all cores.
+    No HSV image is written. mask() writes only the mask, which noise removal
+    still needs. sums() skips the mask entirely and accumulates the per-row
+    count and x sum in registers. The first call compiles the kernels, and
+    the result is cached on disk for later runs.
+    """
+
+    name = "numba"
+
+    def __init__(self, pipeline):
+        if not NUMBA_AVAILABLE:
+            raise ImportError("The numba detection backend needs numba (pip install numba)")
+        super().__init__(pipeline)
+        self.sdiv, self.hdiv = hsv_division_tables()
+        self.thresholds = None
+        self.row_area = np.empty(0, np.int64)
+        self.row_sum_x = np.empty(0, np.int64)
+        self.y_index = np.empty(0, np.int64)
+
+    def bounds(self, lower_hsv, upper_hsv):
+        """Kernel arguments for the thresholds, rebuilt only when they change"""
+        thresholds = (tuple(int(v) for v in lower_hsv), tuple(int(v) for v in upper_hsv))
+        if thresholds != self.thresholds:
+            self.thresholds = thresholds
+            self.lower = np.array(thresholds[0], np.int32)
+            self.upper = np.array(thresholds[1], np.int32)
+            self.wrap = thresholds[0][0] > thresholds[1][0]
+        return self.lower, self.upper, self.wrap
+
+    def mask(self, image, lower_hsv, upper_hsv):
+        height, width = image.shape[:2]
+        self.pipeline.fit(height, width)
+        mask = self.pipeline.mask[:height, :width]
+        lower, upper, wrap = self.bounds(lower_hsv, upper_hsv)
+        with NUMBA_LOCK:
+            _threshold_kernel(np.asarray(image), lower, upper, wrap, self.sdiv, self.hdiv, mask)
+        return mask
+
+    def sums(self, image, lower_hsv, upper_hsv):
+        height = image.shape[0]
+        if len(self.row_area) < height:
+            self.row_area = np.empty(height, np.int64)
+            self.row_sum_x = np.empty(height, np.int64)
+            self.y_index = np.arange(height, dtype=np.int64)
+        row_area = self.row_area[:height]
+        row_sum_x = self.row_sum_x[:height]
+        lower, upper, wrap = self.bounds(lower_hsv, upper_hsv)
+        with NUMBA_LOCK:
+            _threshold_sums_kernel(np.asarray(image), lower, upper, wrap, self.sdiv, self.hdiv,
+                                   row_area, row_sum_x)
+        return int(row_area.sum()), int(row_sum_x.sum()), int(np.dot(row_area, self.y_index[:height]))
+
+
+def make_backend(name, pipeline, lut):
+    if name == "hsv":
+        return HsvBackend(pipeline)
+    if name == "lut":
+        return LutBackend(pipeline, lut)
+    if name == "numba":
+        return NumbaBackend(pipeline)
+    raise ValueError(f"Unknown detection backend: {name} (choose from {', '.join(BACKENDS)})")
+
+
+class BlobDetection:
+    """
+    Detection and tracking state shared by BlobTracker and AutonomousBlobTracker
+
+    Thresholding goes through the backend named by threshold_backend. Every
+    backend provides mask() for the noise-removal path and sums() for the
+    path without it, so a fused backend can skip the mask there. The mask is
+    cleaned by the noise_filter strategy (see noise_filter.NOISE_FILTERS).
+    find_blobs() labels the cleaned mask into a table of separate blobs and
+    blob_selection decides which of them track() follows.
+    """
+
+    def __init__(self):
+        # Default HSV color range (Blue)
+        self.lower_hsv = np.array([34, 30, 94])
+        self.upper_hsv = np.array([68, 116, 229])
+
+        # Blob size limits (in pixels)
+        self.min_blob_area = 500
+        self.max_blob_area = 50000
+
+        # Tracking state
+        self.last_position = None
+        self.last_area = 0
+        self.frames_lost = 0
+        self.max_frames_lost = 10
+
+        # Only search a window around the last position while tracking (opt-in:
+        # pixels outside the window, e.g. a second target, are not counted)
+        self.roi_tracking = False
+
+        # Thresholding backend: "hsv" (cvtColor + inRange), "lut" (BGR lookup
+        # table; experimental, slower than hsv) or "numba" (fused JIT kernel,
+        # needs numba)
+        self.threshold_backend = "hsv"
+        self.color_lut = BgrMaskLut(bits=6)
+        self.backends = {}
+
+        # Detect large blobs at 1/2 or 1/4 resolution (scale picked from last area)
+        self.pyramid_detection = False
+
+        # Quality knobs lowered by the adaptive scheduler under time pressure
+        self.noise_removal = True  # Run the noise filter on the mask
+        self.detection_scale = 1   # Minimum downscale factor for detection
+
+        # Mask noise filter: "morphology" (open + close), "open", "components" or "none"
+        self.noise_filter = "morphology"
+        self.filters = {}
+
+        # Which blob track() follows: "average" (all white pixels), "largest",
+        # "nearest" or "all" (see blobs.SELECTION_POLICIES)
+        self.blob_selection = "average"
+        self.labeller = BlobLabeller()
+
+        # Split full-resolution detection into this many horizontal strips
+        # processed on a thread pool (1 = off, see tiling.TiledDetector)
+        self.strips = 1
+        self.tiler = None
+
+        # Optional motion.MotionGate: reuse the last result on unchanged frames
+        self.motion_gate = None
+
+        # Preallocated buffers for every intermediate image
+        self.pipeline = FramePipeline()
+
+    def detection_backend(self):
+        """Backend object for threshold_backend (created on first use)"""
+        backend = self.backends.get(self.threshold_backend)
+        if backend is None:
+            backend = make_backend(self.threshold_backend, self.pipeline, self.color_lut)
+            self.backends[self.threshold_backend] = backend
+        return backend
+
+    def noise_filter_strategy(self):
+        """Filter object for noise_filter (created on first use)"""
+        strategy = self.filters.get(self.noise_filter)
+        if strategy is None:
+            strategy = self.filters[self.noise_filter] = make_filter(self.noise_filter, self.pipeline)
+        return strategy
+
+    def tiled_detector(self):
+        """TiledDetector for the current strip count (rebuilt when it changes)"""
+        if self.tiler is None or self.tiler.strips != self.strips:
+            if self.tiler is not None:
+                self.tiler.close()
+            self.tiler = TiledDetector(self.strips, make_backend, make_filter, self.color_lut.bits)
+        return self.tiler
+
+    def detect_blob(self, frame, kernel=None):
+        """
+        Detect the colored blob in the frame
+
+        The mask is written into the pipeline's preallocated buffer and is
+        overwritten by the next call; copy it if it needs to be kept.
+        """
+        if kernel is None:
+            kernel = MORPH_KERNEL
+
+        mask = self.detection_backend().mask(frame, self.lower_hsv, self.upper_hsv)
+
+        if not self.noise_removal:
+            return mask
+
+        # Remove noise
+        return self.noise_filter_strategy().apply(mask, kernel)
+
+    def get_average_position(self, mask):
+        """Calculate average position of all white pixels (1s) in the mask"""
+        # Area and centroid come from row/column sums, so no coordinate
+        # arrays are built for the white pixels
+        area, sum_x, sum_y = self.pipeline.sums(mask)
+        return centroid_from_sums(area, sum_x, sum_y, self.min_blob_area, self.max_blob_area)
+
+    def current_scale(self):
+        """Downscale factor for the next detection"""
+        scale = self.detection_scale
+        if self.pyramid_detection:
+            scale = max(scale, choose_scale(self.last_area, self.min_blob_area))
+        return scale
+
+    def locate_blob(self, image):
+        """
+        Detect the blob in an image (or ROI) and return (center, area)
+
+        With pyramid_detection enabled, large blobs are thresholded at a
+        reduced scale; center and area are mapped back to full resolution.
+        detection_scale forces at least that downscale factor.
+
+        With strips > 1, tall images are split across a thread pool; the
+        result is identical.
+        """
+        scale = self.current_scale()
+
+        kernel = MORPH_KERNEL
+        if scale > 1:
+            image = self.pipeline.downscale(image, scale)
+            kernel = SCALED_KERNEL
+
+        sums = None
+        if self.strips > 1:
+            sums = self.tiled_detector().sums(self, image, kernel)
+
+        if sums is not None:
+            area, sum_x, sum_y = sums
+        elif self.noise_removal and self.noise_filter != "none":
+            mask = self.detect_blob(image, kernel=kernel)
+            area, sum_x, sum_y = self.pipeline.sums(mask)
+        else:
+            # No morphology: the backend can go straight to the sums
+            area, sum_x, sum_y = self.detection_backend().sums(image, self.lower_hsv, self.upper_hsv)
+
+        if scale == 1:
+            return centroid_from_sums(area, sum_x, sum_y, self.min_blob_area, self.max_blob_area)
+        return scaled_centroid(area, sum_x, sum_y, scale, self.min_blob_area, self.max_blob_area)
+
+    def locate_blobs(self, image, origin=(0, 0)):
+        """
+        BlobTable of every blob in an image (or ROI) within the size limits
+
+        Same thresholding, noise filter and scale as locate_blob(), then one
+        connected-component pass. origin is the image's position in the full
+        frame; the table is always in full-frame, full-resolution pixels.
+        """
+        scale = self.current_scale()
+        kernel = MORPH_KERNEL
+        if scale > 1:
+            image = self.pipeline.downscale(image, scale)
+            kernel = SCALED_KERNEL
+        mask = self.detect_blob(image, kernel=kernel)
+        return self.labeller.label(mask, self.min_blob_area, self.max_blob_area, scale, origin)
+
+    def find_blobs(self, frame):
+        """
+        BlobTable of every blob in the whole frame
+
+        Does not use or change the tracking state, so it can run alongside track().
+        """
+        self.pipeline.bind(frame.shape)
+        return self.locate_blobs(frame)
+
+    def track(self, frame):
+        """
+        Find the blob in the frame and update the tracking state
+
+        With roi_tracking enabled, detection only runs inside a window around
+        last_position. The window grows on every missed frame and falls back to
+        a full-frame search after max_frames_lost misses.
+
+        With a motion_gate set, frames that barely differ from the last
+        detected one reuse its result instead of running detection.
+
+        Any blob_selection other than "average" labels the mask and follows
+        the blob the policy picks, using last_position for "nearest".
+        """
+        if self.motion_gate is not None:
+            cached = self.motion_gate.reuse(frame)
+            if cached is not None:
+                return cached
+
+        # Buffers are rebuilt only when the frame shape changes
+        self.pipeline.bind(frame.shape)
+
+        window = None
+        if self.roi_tracking:
+            window = roi_window(self.last_position, self.last_area, self.frames_lost,
+                                self.max_frames_lost, frame.shape)
+
+        if self.blob_selection != "average":
+            if window is None:
+                table = self.locate_blobs(frame)
+            else:
+                x0, y0, x1, y1 = window
+                table = self.locate_blobs(frame[y0:y1, x0:x1], origin=(x0, y0))
+            center, area = table.select(self.blob_selection, self.last_position)
+        elif window is None:
+            center, area = self.locate_blob(frame)
+        else:
+            x0, y0, x1, y1 = window
+            center, area = self.locate_blob(frame[y0:y1, x0:x1])
+            if center is not None:
+                # Back to full-frame coordinates
+                center = (center[0] + x0, center[1] + y0)
+
+        # Update tracking state
+        if center is not None:
+            self.last_position = center
+            self.last_area = area
+            self.frames_lost = 0
+        else:
+            self.frames_lost += 1
+
+        if self.motion_gate is not None:
+            self.motion_gate.store(center, area)
+        return center, area
@@ -0,0 +1,300 @@
+"""
+Local stand-in for the ESP32 motor controller web server and UDP listener
+Lets the tracker and motor senders run without hardware
+"""
+
+import asyncio
+import json
+import random
+import socket
+import threading
+import time
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from motor_sender import (STATUS_APPLIED, STATUS_STALE, UDP_PORT, pack_ack, sequence_newer,
+                          unpack_command)
+
+# Same safety stop as the firmware: motors stop without a command for 500ms
+COMMAND_TIMEOUT = 0.5
+
+
+class StubMotorState:
+    """
+    Motor state and HTTP routes of NEW TRASH.ino, shared by the stub servers
+
+    /control accepts either ?a=<speed>&b=<speed> or the older ?motor=A&speed=<speed>.
+    Every command is recorded in self.commands as (time, motorA, motorB).
+    delay adds an artificial round-trip time in seconds.
+    """
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.motor_a = 0
+        self.motor_b = 0
+        self.autonomous = False
+        self.last_command_time = 0.0
+        self.commands = []
+        self.lock = threading.Lock()
+
+    def respond(self, path):
+        """(status code, content type, body) for one GET request"""
+        url = urlparse(path)
+        args = {key: values[-1] for key, values in parse_qs(url.query).items()}
+
+        if url.path == "/":
+            return 200, "text/html", "<h1>ESP32 Motor Control (stub)</h1>"
+        if url.path == "/control":
+            with self.lock:
+                if "a" in args or "b" in args:
+                    self.motor_a = clamp_speed(args.get("a", self.motor_a))
+                    self.motor_b = clamp_speed(args.get("b", self.motor_b))
+                elif args.get("motor") == "A":
+                    self.motor_a = clamp_speed(args.get("speed", 0))
+                elif args.get("motor") == "B":
+                    self.motor_b = clamp_speed(args.get("speed", 0))
+                self.autonomous = True
+                self.last_command_time = time.monotonic()
+                self.commands.append((self.last_command_time, self.motor_a, self.motor_b))
+            return 200, "text/plain", "OK"
+        if url.path == "/stop":
+            with self.lock:
+                self.motor_a = 0
+                self.motor_b = 0
+                self.autonomous = False
+                self.commands.append((time.monotonic(), 0, 0))
+            return 200, "text/plain", "Stopped"
+        if url.path == "/status":
+            with self.lock:
+                status = {"motorA": self.motor_a, "motorB": self.motor_b,
+                          "autonomous": self.autonomous}
+            return 200, "application/json", json.dumps(status)
+        return 404, "text/plain", "Not found"
+
+
+class StubESP32Server(StubMotorState):
+    """
+    Serves the same routes as NEW TRASH.ino on localhost (see StubMotorState)
+
+    With udp_port set (0 picks a free port) binary UDP commands are accepted
+    too, with the firmware's sequence-number check, acknowledgement and
+    COMMAND_TIMEOUT safety stop. udp_loss drops that fraction of datagrams
+    in each direction to exercise the sender's loss handling.
+
+    Whether the ESP32 WebServer keeps connections alive depends on its
+    version, so keep_alive=False answers with "Connection: close" and closes
+    the connection after every response instead.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, udp_port=None, udp_loss=0.0, keep_alive=True):
+        super().__init__(delay)
+        self.keep_alive = keep_alive
+
+        # UDP protocol state
+        self.udp_loss = udp_loss
+        self.last_seq = None
+        self.last_udp_time = 0.0
+        self.udp_stats = {"received": 0, "applied": 0, "stale": 0, "dropped": 0, "timeouts": 0}
+        self.udp_sock = None
+        self.udp_thread = None
+        if udp_port is not None:
+            self.udp_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self.udp_sock.bind((host, udp_port))
+            self.udp_sock.settimeout(0.05)
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive unless the reply says "Connection: close"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                stub.handle(self)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self.thread = None
+
+    @property
+    def address(self):
+        """host:port string usable as the tracker's esp32_ip"""
+        host, port = self.server.server_address[:2]
+        return f"{host}:{port}"
+
+    @property
+    def udp_address(self):
+        """(host, port) of the UDP listener"""
+        return self.udp_sock.getsockname() if self.udp_sock is not None else None
+
+    def start(self):
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        if self.udp_sock is not None:
+            self.udp_thread = threading.Thread(target=self.udp_loop, daemon=True)
+            self.udp_thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if self.udp_sock is not None:
+            sock, self.udp_sock = self.udp_sock, None
+            self.udp_thread.join(timeout=1.0)
+            sock.close()
+
+    def udp_loop(self):
+        sock = self.udp_sock
+        while self.udp_sock is not None:
+            try:
+                packet, sender = sock.recvfrom(64)
+            except socket.timeout:
+                packet = None
+            if packet is not None:
+                ack = self.handle_datagram(packet)
+                if ack is not None:
+                    if self.delay:
+                        time.sleep(self.delay)
+                    if random.random() < self.udp_loss:
+                        self.udp_stats["dropped"] += 1
+                    else:
+                        sock.sendto(ack, sender)
+            self.check_timeout()
+
+    def handle_datagram(self, packet):
+        """Apply one UDP command like the firmware does; returns the ack (or None)"""
+        command = unpack_command(packet)
+        if command is None:
+            return None
+        if random.random() < self.udp_loss:
+            self.udp_stats["dropped"] += 1
+            return None
+        seq, speed_a, speed_b, timestamp_us = command
+        now = time.monotonic()
+        with self.lock:
+            self.udp_stats["received"] += 1
+            # A sender that was silent longer than the timeout starts a new session
+            fresh = (self.last_seq is None or now - self.last_udp_time > COMMAND_TIMEOUT
+                     or sequence_newer(seq, self.last_seq))
+            if fresh:
+                self.last_seq = seq
+                self.last_udp_time = now
+                self.last_command_time = now
+                self.motor_a = clamp_speed(speed_a)
+                self.motor_b = clamp_speed(speed_b)
+                self.autonomous = True
+                self.commands.append((now, self.motor_a, self.motor_b))
+                self.udp_stats["applied"] += 1
+                status = STATUS_APPLIED
+            else:
+                self.udp_stats["stale"] += 1
+                status = STATUS_STALE
+            return pack_ack(seq, status, self.motor_a, self.motor_b, timestamp_us)
+
+    def check_timeout(self):
+        """Emergency stop when autonomous commands stop arriving"""
+        with self.lock:
+            if (self.autonomous and time.monotonic() - self.last_command_time > COMMAND_TIMEOUT
+                    and (self.motor_a or self.motor_b)):
+                self.motor_a = 0
+                self.motor_b = 0
+                self.autonomous = False
+                self.commands.append((time.monotonic(), 0, 0))
+                self.udp_stats["timeouts"] += 1
+
+    def handle(self, request):
+        if self.delay:
+            time.sleep(self.delay)
+        self.reply(request, *self.respond(request.path))
+
+    def reply(self, request, code, content_type, body):
+        data = body.encode()
+        request.send_response(code)
+        request.send_header("Content-Type", content_type)
+        request.send_header("Content-Length", str(len(data)))
+        if not self.keep_alive:
+            request.send_header("Connection", "close")  # Also makes the handler close it
+        request.end_headers()
+        request.wfile.write(data)
+
+
+class AsyncStubESP32Server(StubMotorState):
+    """
+    The stub's HTTP routes on an asyncio server
+
+    Dozens of these run in one event loop, one per stand-in rover, without a
+    thread each. As with StubESP32Server, connections are kept alive unless
+    keep_alive is False; whether the rover's WebServer keeps them alive
+    depends on its version.
+    """
+
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, keep_alive=True):
+        super().__init__(delay)
+        self.host = host
+        self.port = port
+        self.keep_alive = keep_alive
+        self.server = None
+        self.connections = set()
+
+    @property
+    def address(self):
+        """host:port string usable as a rover address"""
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return f"{host}:{port}"
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.serve, self.host, self.port)
+        return self
+
+    async def stop(self):
+        self.server.close()
+        for writer in list(self.connections):
+            writer.close()
+        await self.server.wait_closed()
+
+    async def serve(self, reader, writer):
+        """Answer GET requests on one connection until either side closes it"""
+        self.connections.add(writer)
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                # Skip the headers; GET requests have no body
+                while (await reader.readline()).strip():
+                    pass
+                if self.delay:
+                    await asyncio.sleep(self.delay)
+                code, content_type, body = self.respond(request_line.split()[1].decode())
+                data = body.encode()
+                writer.write(f"HTTP/1.1 {code} {HTTPStatus(code).phrase}\r\n"
+                             f"Content-Type: {content_type}\r\n"
+                             f"Content-Length: {len(data)}\r\n"
+                             f"Connection: {'keep-alive' if self.keep_alive else 'close'}\r\n\r\n".encode() + data)
+                await writer.drain()
+                if not self.keep_alive:
+                    break
+        except (ConnectionError, IndexError, asyncio.CancelledError):
+            pass  # Client gone, malformed request, or the event loop shutting down
+        finally:
+            self.connections.discard(writer)
+            writer.close()
+
+
+def clamp_speed(value):
+    """Same clamping as the firmware: -255 to 255"""
+    return max(-255, min(255, int(value)))
+
+
+if __name__ == "__main__":
+    server = StubESP32Server(port=8080, udp_port=UDP_PORT).start()
+    print(f"✓ ESP32 stub listening on http://{server.address} and udp://127.0.0.1:{UDP_PORT}")
+    print("  Run bob.py and enter this address as the ESP32 IP")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
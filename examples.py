@@ -101,37 +101,42 @@ def example_track_multiple_blobs():
     Demonstrates finding all valid blobs, not just the largest
     Useful for multi-target applications
     """
+    from capture import make_synthetic_frame
+    
     tracker = BlobTracker()
     
-    # Simulated contours (in real use, these come from detect_blob)
-    contours = [
-        # Each contour would be a numpy array in real use
-    ]
+    # Two targets in the default color and one speck below min_blob_area
+    frame = make_synthetic_frame(640, 480, (160, 240), 40)
+    color = tuple(int(c) for c in frame[240, 160])
+    cv2.circle(frame, (470, 200), 25, color, -1)
+    cv2.circle(frame, (320, 420), 8, color, -1)
     
-    # Modified logic to get all valid blobs instead of largest
-    valid_blobs = []
-    for contour in contours:
-        area = cv2.contourArea(contour)
-        if tracker.min_blob_area < area < tracker.max_blob_area:
-            valid_blobs.append({
-                'contour': contour,
-                'area': area,
-                'center': tracker.get_blob_center(contour)
-            })
+    # One connected-component pass; the table holds area, centroid and bounding box
+    blobs = tracker.find_blobs(frame)
+    for blob in blobs:
+        print(f"Blob at {blob.center}: {blob.area} pixels, box {blob.bbox}")
+    print(f"Found {len(blobs)} valid blobs")
     
-    print(f"Found {len(valid_blobs)} valid blobs")
-    return valid_blobs
+    # Let track() follow one blob instead of the average of all white pixels
+    tracker.blob_selection = "nearest"
+    tracker.last_position = (450, 210)
+    center, area = tracker.track(frame)
+    print(f"Nearest to (450, 210): {center} ({area} pixels)")
+    return blobs
 
 
 # Example 7: Frame rate and performance monitoring
-def example_performance_monitoring():
+def example_performance_monitoring(source=0):
     """
     Add performance monitoring to track FPS and detection speed
+    Pass source="synthetic" to run without a camera
+    (see benchmarks.py for the full per-stage benchmark suite)
     """
     import time
+    from capture import open_capture
     
     tracker = BlobTracker()
-    cap = cv2.VideoCapture(0)
+    cap = open_capture(source)
     
     frame_times = []
     detection_times = []
@@ -145,7 +150,8 @@ def example_performance_monitoring():
         
         # Timing blob detection
         detect_start = time.time()
-        mask, contours = tracker.detect_blob(frame)
+        mask = tracker.detect_blob(frame)
+        center, area = tracker.get_average_position(mask)
         detection_times.append(time.time() - detect_start)
         
         frame_times.append(time.time() - start)
@@ -189,6 +195,31 @@ def example_custom_visualization():
     print("Custom overlay added")
 
 
+# Example 9: Several colors in one pass
+def example_track_multiple_colors(source=0):
+    """
+    Track several preset colors at once (red wraps around hue 179 -> 0)
+    The frame is converted and labelled once for all colors
+    """
+    from capture import open_capture
+    from multicolor import MultiColorDetector, targets_from_presets
+    
+    detector = MultiColorDetector(targets_from_presets(["red", "green", "blue"]))
+    cap = open_capture(source)
+    ret, frame = cap.read()
+    cap.release()
+    if not ret:
+        return []
+    
+    blobs = detector.detect(frame)
+    for blob in blobs:
+        if blob.center:
+            print(f"{blob.name:<8} at {blob.center} ({blob.area} pixels)")
+        else:
+            print(f"{blob.name:<8} not found")
+    return blobs
+
+
 if __name__ == "__main__":
     print("Blob Tracker - Advanced Examples\n")
     
@@ -209,6 +240,12 @@ if __name__ == "__main__":
     example_rover_integration()
     
     print("\n6. Performance monitoring:")
-    # example_performance_monitoring()  # Uncomment to run (requires camera)
+    example_performance_monitoring("synthetic")  # Pass 0 to use the camera
+    
+    print("\n7. Multi-color tracking:")
+    example_track_multiple_colors("synthetic")
+    
+    print("\n8. Multiple blobs of one color:")
+    example_track_multiple_blobs()
     
     print("\nFor more examples and documentation, see README.md")
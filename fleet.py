@@ -0,0 +1,423 @@
+"""
+asyncio fleet controller for many ESP32 rovers
+One process steers dozens of rovers: every tracked target has its own
+AutonomousBlobTracker steering and an async link to its rover's web server
+
+Run with: python fleet.py [source] --rover COLOR=ADDRESS [--rover ...] [--stubs]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+# Transport errors that count as a failed command or poll
+LINK_ERRORS = (OSError, asyncio.IncompleteReadError, ValueError)
+
+
+class HttpConnection:
+    """
+    One keep-alive HTTP/1.1 connection issuing GET requests
+
+    Handles the responses the ESP32 WebServer sends (Content-Length bodies).
+    The connection is opened on first use, and closed after a response with
+    "Connection: close" or from an HTTP/1.0 server, as some WebServer
+    versions don't keep connections alive.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def get(self, target):
+        """(status code, body bytes) for GET target"""
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        self.writer.write(f"GET {target} HTTP/1.1\r\nHost: {self.host}\r\n\r\n".encode())
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("Connection closed by the rover")
+        version, status = status_line.split()[:2]
+        keep_alive = version != b"HTTP/1.0"
+        length = 0
+        while True:
+            header = await self.reader.readline()
+            if not header.strip():
+                break
+            name, _, value = header.decode("latin-1").partition(":")
+            name, value = name.strip().lower(), value.strip().lower()
+            if name == "content-length":
+                length = int(value)
+            elif name == "connection" and value in ("close", "keep-alive"):
+                keep_alive = value == "keep-alive"
+        body = await self.reader.readexactly(length)
+        if not keep_alive:
+            self.close()  # The rover closes its end after this response
+        return int(status), body
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+
+class ConnectionPool:
+    """
+    At most size keep-alive connections to one rover
+
+    Requests wait for a free connection instead of opening more. A
+    connection that fails or is cancelled mid-request (timeout) is closed,
+    since its response may still arrive later. A reused connection that the
+    rover had already closed is retried once on a fresh one, and one the
+    rover closes after its response is not reused.
+    """
+
+    def __init__(self, host, port, size=2):
+        self.host = host
+        self.port = port
+        self.idle = []
+        self.slots = asyncio.Semaphore(size)
+        self.opened = 0
+        self.retries = 0  # Reused connections the rover had closed
+
+    async def get(self, target):
+        async with self.slots:
+            for attempt in range(2):
+                reused = bool(self.idle)
+                if reused:
+                    connection = self.idle.pop()
+                else:
+                    connection = HttpConnection(self.host, self.port)
+                    self.opened += 1
+                try:
+                    result = await connection.get(target)
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    connection.close()
+                    if reused and attempt == 0:
+                        self.retries += 1
+                        continue
+                    raise
+                except BaseException:
+                    connection.close()
+                    raise
+                if connection.writer is not None:
+                    self.idle.append(connection)
+                return result
+
+    def close(self):
+        for connection in self.idle:
+            connection.close()
+        self.idle = []
+
+
+class RoverLink:
+    """
+    Async motor commands and /status polls for one rover
+
+    Like motor_sender.MotorCommandSender, only the newest command is kept:
+    submitting while a command is in flight replaces the waiting one. Every
+    request has its own timeout, so a slow or dead rover never holds up the
+    others.
+    """
+
+    def __init__(self, address, timeout=0.3, pool_size=2):
+        host, _, port = address.partition(":")
+        self.address = address
+        self.timeout = timeout
+        self.pool = ConnectionPool(host, int(port or 80), pool_size)
+        self.pending = None
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+        # Statistics
+        self.sent = 0
+        self.failed = 0
+        self.timeouts = 0
+        self.coalesced = 0
+        self.latencies = deque(maxlen=1000)
+        self.polls = 0
+        self.poll_failures = 0
+        self.status = None  # Last /status reply
+
+    def start(self):
+        if self.task is None:
+            self.task = asyncio.create_task(self.send_loop())
+        return self
+
+    async def request(self, target):
+        """Response body, or None on error, non-200 reply or timeout"""
+        try:
+            status, body = await asyncio.wait_for(self.pool.get(target), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            return None
+        except LINK_ERRORS:
+            return None
+        return body if status == 200 else None
+
+    async def send(self, speed_a, speed_b):
+        """Send one command now; returns True when the rover accepted it"""
+        start = time.perf_counter()
+        ok = await self.request(f"/control?a={int(speed_a)}&b={int(speed_b)}") is not None
+        if ok:
+            self.sent += 1
+            self.latencies.append(time.perf_counter() - start)
+        else:
+            self.failed += 1
+        return ok
+
+    def submit(self, speed_a, speed_b=None):
+        """Queue a command without waiting; replaces any unsent command"""
+        if speed_b is None:
+            speed_b = speed_a
+        if self.pending is not None:
+            self.coalesced += 1
+        self.pending = (int(speed_a), int(speed_b))
+        self.wakeup.set()
+
+    async def send_loop(self):
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            speed_a, speed_b = self.pending
+            self.pending = None
+            await self.send(speed_a, speed_b)
+
+    async def poll_status(self):
+        """Fetch /status; returns the parsed reply or None"""
+        self.polls += 1
+        body = await self.request("/status")
+        try:
+            self.status = json.loads(body)
+        except (TypeError, ValueError):
+            self.poll_failures += 1
+            return None
+        return self.status
+
+    async def stop(self):
+        """Stop the send loop, send a stop command and close the connections"""
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        self.pending = None
+        ok = await self.send(0, 0)
+        self.pool.close()
+        return ok
+
+    def stats(self):
+        values = np.array(self.latencies) * 1000
+        return {
+            "sent": self.sent,
+            "failed": self.failed,
+            "timeouts": self.timeouts,
+            "coalesced": self.coalesced,
+            "latency_p50_ms": float(np.percentile(values, 50)) if len(values) else 0.0,
+            "latency_p95_ms": float(np.percentile(values, 95)) if len(values) else 0.0,
+            "polls": self.polls,
+            "poll_failures": self.poll_failures,
+            "connections": self.pool.opened,
+            "retries": self.pool.retries,
+        }
+
+
+class Rover:
+    """One tracked target: AutonomousBlobTracker steering plus the rover's link"""
+
+    def __init__(self, name, address, config=None, timeout=0.3):
+        from bob import AutonomousBlobTracker
+
+        self.name = name
+        # Only the steering is used; commands go through the link, so the
+        # tracker gets no motor sender
+        self.tracker = AutonomousBlobTracker(address, check_connection=False, transport=None)
+        if config is not None:
+            self.tracker.apply_config(config)
+        self.link = RoverLink(address, timeout)
+        self.command = "STOP - Lost tracking"
+
+    def steer(self, center, frame_shape):
+        """calculate_motor_speed for the target, rate-limited to command_interval"""
+        motor_speed, self.command = self.tracker.calculate_motor_speed(center, frame_shape)
+        current_time = time.time()
+        if current_time - self.tracker.last_command_time >= self.tracker.command_interval:
+            self.link.submit(motor_speed)
+            self.tracker.last_command_time = current_time
+        return motor_speed
+
+
+class FleetController:
+    """
+    Drives many rovers from one event loop
+
+    Each rover's commands go out on its own task, so all rovers are served
+    concurrently. /status is polled for every rover at once every
+    poll_interval seconds. stop() sends every rover a stop command, also
+    concurrently.
+    """
+
+    def __init__(self, rovers, poll_interval=1.0):
+        self.rovers = {rover.name: rover for rover in rovers}
+        self.poll_interval = poll_interval
+        self.poll_task = None
+
+    async def start(self):
+        for rover in self.rovers.values():
+            rover.link.start()
+        self.poll_task = asyncio.create_task(self.poll_loop())
+        return self
+
+    def steer(self, centers, frame_shape):
+        """Steer every rover from {name: center}; missing names count as lost"""
+        for name, rover in self.rovers.items():
+            rover.steer(centers.get(name), frame_shape)
+
+    async def poll_loop(self):
+        while True:
+            await asyncio.gather(*(rover.link.poll_status() for rover in self.rovers.values()))
+            await asyncio.sleep(self.poll_interval)
+
+    async def stop(self):
+        """Stop polling and send every rover a stop command; returns {name: stopped}"""
+        if self.poll_task is not None:
+            self.poll_task.cancel()
+            try:
+                await self.poll_task
+            except asyncio.CancelledError:
+                pass
+            self.poll_task = None
+        results = await asyncio.gather(*(rover.link.stop() for rover in self.rovers.values()))
+        return dict(zip(self.rovers, results))
+
+    def stats(self):
+        return {name: rover.link.stats() for name, rover in self.rovers.items()}
+
+
+def print_report(fleet, stopped):
+    """Per-rover command and poll counts"""
+    print("\n=== Fleet report ===")
+    for name, stats in fleet.stats().items():
+        rover = fleet.rovers[name]
+        print(f"{name:<10} {rover.link.address:<22} sent {stats['sent']:>5} failed {stats['failed']:>3} "
+              f"(timeouts {stats['timeouts']})  p50 {stats['latency_p50_ms']:.1f}ms "
+              f"p95 {stats['latency_p95_ms']:.1f}ms  polls {stats['polls']}  "
+              f"connections {stats['connections']}  {'stopped' if stopped.get(name) else 'STOP FAILED'}")
+
+
+async def run_fleet(source, assignments, config=None, duration=None, stubs=False, timeout=0.3,
+                    poll_interval=1.0, realtime=False):
+    """
+    Track one preset color per rover in a shared camera view and steer each rover
+
+    assignments maps preset color names to rover addresses. All colors are
+    detected in one multicolor.MultiColorDetector pass per frame, which runs
+    in a worker thread so the event loop keeps serving the rovers. With
+    stubs=True a local AsyncStubESP32Server stands in for every rover.
+    Stops when the source ends, Ctrl+C is hit or duration seconds have
+    passed; every rover is sent a stop command.
+    """
+    from capture import LatestFrameSource, is_live_source, open_capture
+    from esp32_stub import AsyncStubESP32Server
+    from multicolor import MultiColorDetector, targets_from_presets
+
+    servers = []
+    if stubs:
+        servers = [await AsyncStubESP32Server().start() for _ in assignments]
+        assignments = {name: server.address for name, server in zip(assignments, servers)}
+
+    targets = targets_from_presets(list(assignments))
+    if config is not None:
+        targets = [target._replace(min_blob_area=config.min_blob_area, max_blob_area=config.max_blob_area)
+                   for target in targets]
+    detector = MultiColorDetector(targets)
+    fleet = await FleetController([Rover(name, address, config, timeout)
+                                   for name, address in assignments.items()], poll_interval).start()
+    print(f"✓ Steering {len(assignments)} rovers: "
+          + ", ".join(f"{name} → {address}" for name, address in assignments.items()))
+
+    cap = LatestFrameSource(open_capture(source, realtime=realtime),
+                            drop_frames=is_live_source(source) or realtime).start()
+
+    def detect():
+        captured = cap.read_latest(timeout=5.0)
+        if captured is None:
+            return None, None
+        return captured.frame.shape, {blob.name: blob.center for blob in detector.detect(captured.frame)}
+
+    loop = asyncio.get_running_loop()
+    start_time = time.monotonic()
+    report_time = time.time()
+    frames = 0
+    try:
+        while duration is None or time.monotonic() - start_time < duration:
+            shape, centers = await loop.run_in_executor(None, detect)
+            if shape is None:
+                break
+            fleet.steer(centers, shape)
+            frames += 1
+
+            current_time = time.time()
+            if current_time - report_time >= 1.0:
+                found = sum(center is not None for center in centers.values())
+                print(f"{frames / (current_time - report_time):5.1f} fps | {found}/{len(centers)} targets found")
+                frames = 0
+                report_time = current_time
+    finally:
+        stopped = await fleet.stop()
+        cap.release()
+        print_report(fleet, stopped)
+        for server in servers:
+            await server.stop()
+    return fleet.stats()
+
+
+def parse_assignment(text):
+    """COLOR=ADDRESS command-line value"""
+    name, separator, address = text.partition("=")
+    if not separator or not name:
+        raise argparse.ArgumentTypeError(f"Expected COLOR=ADDRESS, got {text!r}")
+    return name, address
+
+
+if __name__ == "__main__":
+    from bob import AutonomousBlobTracker
+    from settings import Settings, SettingsWatcher
+
+    parser = argparse.ArgumentParser(description="Steer several ESP32 rovers from one process")
+    parser.add_argument("source", nargs="?", default=0,
+                        help="camera index, video file, .frames recording or 'synthetic' (default: 0)")
+    parser.add_argument("--rover", action="append", type=parse_assignment, required=True,
+                        metavar="COLOR=ADDRESS", help="preset color tracked for the rover at ADDRESS")
+    parser.add_argument("--stubs", action="store_true",
+                        help="start a local stand-in ESP32 server for every rover instead")
+    parser.add_argument("--settings", default=None,
+                        help=f"settings JSON for blob sizes and speeds (default: {Settings.SETTINGS_FILE})")
+    parser.add_argument("--timeout", type=float, default=0.3,
+                        help="per-request timeout in seconds (default: 0.3)")
+    parser.add_argument("--poll-interval", type=float, default=1.0,
+                        help="seconds between /status polls (default: 1)")
+    parser.add_argument("--duration", type=float, default=None, help="stop after N seconds")
+    parser.add_argument("--realtime", action="store_true",
+                        help="replay a .frames recording at its recorded speed")
+    args = parser.parse_args()
+
+    config = None
+    if args.settings:
+        # Keys the file leaves out keep the rover tracker's defaults
+        defaults = Settings.settings_from_tracker(AutonomousBlobTracker(check_connection=False, transport=None))
+        config = SettingsWatcher(args.settings, defaults=defaults).config
+    try:
+        asyncio.run(run_fleet(args.source, dict(args.rover), config, args.duration, args.stubs,
+                              args.timeout, args.poll_interval, args.realtime))
+    except KeyboardInterrupt:
+        print("\n⚠️ Keyboard interrupt")
@@ -0,0 +1,232 @@
+"""
+Low-overhead instrumentation for the tracking loop
+Per-stage latency histograms, camera-to-command latency, dropped frames and
+command send results, exposed over a Prometheus-style HTTP endpoint
+"""
+
+import bisect
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Histogram bucket upper bounds in seconds (Prometheus "le" labels)
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with count and sum"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # Last bucket is +Inf
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding it"""
+        if self.count == 0:
+            return 0.0
+        target = q * self.count
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            if running >= target:
+                return bound
+        return float("inf")
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+
+class StageTimer:
+    """Context manager that records the time spent in one stage"""
+
+    __slots__ = ("histogram", "start")
+
+    def __init__(self, histogram):
+        self.histogram = histogram
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start)
+        return False
+
+
+class NullTimer:
+    """Shared do-nothing context manager used when metrics are disabled"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = NullTimer()
+
+
+class Metrics:
+    """
+    Tracking-loop metrics registry
+
+    with metrics.stage("detect"): ... records a stage latency. When created
+    with enabled=False every method returns immediately and stage() hands back
+    a shared no-op context manager, so disabled metrics cost only a call.
+    """
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.stages = {}
+        self.timers = {}
+        self.frame_latency = Histogram()   # Capture to command decision
+        self.command_rtt = Histogram()     # ESP32 round trip
+        self.frames = 0
+        self.dropped_frames = 0
+        self.commands_ok = 0
+        self.commands_failed = 0
+        self.counters = {}  # Extra totals, e.g. motion gate hits/misses
+        self.started = time.monotonic()
+        self.server = None
+
+    def stage(self, name):
+        if not self.enabled:
+            return NULL_TIMER
+        timer = self.timers.get(name)
+        if timer is None:
+            with self.lock:
+                histogram = self.stages.setdefault(name, Histogram())
+            timer = self.timers[name] = StageTimer(histogram)
+        return timer
+
+    def observe_stage(self, name, seconds):
+        """Record a stage latency measured elsewhere (e.g. on another thread)"""
+        if not self.enabled:
+            return
+        with self.lock:
+            histogram = self.stages.setdefault(name, Histogram())
+        histogram.observe(seconds)
+
+    def frame_done(self, capture_timestamp):
+        """Record camera-to-command latency for one frame (time.monotonic stamps)"""
+        if not self.enabled:
+            return
+        self.frames += 1
+        self.frame_latency.observe(time.monotonic() - capture_timestamp)
+
+    def set_dropped_frames(self, dropped):
+        if self.enabled:
+            self.dropped_frames = dropped
+
+    def set_counter(self, name, value):
+        """Publish a running total kept elsewhere as blob_tracker_<name>_total"""
+        if self.enabled:
+            with self.lock:
+                self.counters[name] = value
+
+    def command_result(self, ok, rtt=None):
+        """Record one motor command send and its round-trip time in seconds"""
+        if not self.enabled:
+            return
+        with self.lock:
+            if ok:
+                self.commands_ok += 1
+                if rtt is not None:
+                    self.command_rtt.observe(rtt)
+            else:
+                self.commands_failed += 1
+
+    def snapshot(self):
+        """(stages, counters) items copied under the lock; safe to iterate from any thread"""
+        with self.lock:
+            return list(self.stages.items()), list(self.counters.items())
+
+    def prometheus_text(self):
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        stages, counters = self.snapshot()
+
+        def histogram_lines(name, histogram, labels=""):
+            running = 0
+            separator = "," if labels else ""
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                running += count
+                le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                lines.append(f'{name}_bucket{{{labels}{separator}le="{le}"}} {running}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.total:.6f}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        lines.append("# TYPE blob_tracker_stage_seconds histogram")
+        for name, histogram in sorted(stages):
+            histogram_lines("blob_tracker_stage_seconds", histogram, f'stage="{name}"')
+        lines.append("# TYPE blob_tracker_frame_latency_seconds histogram")
+        histogram_lines("blob_tracker_frame_latency_seconds", self.frame_latency)
+        lines.append("# TYPE blob_tracker_command_rtt_seconds histogram")
+        histogram_lines("blob_tracker_command_rtt_seconds", self.command_rtt)
+
+        lines.append("# TYPE blob_tracker_frames_total counter")
+        lines.append(f"blob_tracker_frames_total {self.frames}")
+        lines.append("# TYPE blob_tracker_dropped_frames_total counter")
+        lines.append(f"blob_tracker_dropped_frames_total {self.dropped_frames}")
+        lines.append("# TYPE blob_tracker_commands_total counter")
+        lines.append(f'blob_tracker_commands_total{{result="ok"}} {self.commands_ok}')
+        lines.append(f'blob_tracker_commands_total{{result="failed"}} {self.commands_failed}')
+        for name, value in sorted(counters):
+            lines.append(f"# TYPE blob_tracker_{name}_total counter")
+            lines.append(f"blob_tracker_{name}_total {value}")
+        return "\n".join(lines) + "\n"
+
+    def summary(self):
+        """One-line console summary"""
+        elapsed = max(time.monotonic() - self.started, 1e-6)
+        stages = "  ".join(f"{name} {histogram.mean() * 1000:.1f}ms"
+                           for name, histogram in self.snapshot()[0])
+        return (f"{self.frames / elapsed:5.1f} fps | {stages} | "
+                f"cam→cmd p50≤{self.frame_latency.quantile(0.5) * 1000:.0f}ms "
+                f"p95≤{self.frame_latency.quantile(0.95) * 1000:.0f}ms | "
+                f"dropped {self.dropped_frames} | "
+                f"cmd ok {self.commands_ok} failed {self.commands_failed} "
+                f"rtt {self.command_rtt.mean() * 1000:.1f}ms")
+
+    def serve(self, port=9100, host="127.0.0.1"):
+        """Expose /metrics on a background HTTP server"""
+        if not self.enabled:
+            return None
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != "/metrics":
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self.server
+
+    def close(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
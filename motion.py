@@ -0,0 +1,98 @@
+"""
+Motion-gated detection
+Reuses the last blob result while a cheap downsampled frame difference shows no change
+"""
+
+import cv2
+import numpy as np
+
+# Frames are compared at 1/GATE_SCALE resolution
+GATE_SCALE = 8
+
+
+class MotionGate:
+    """
+    Decides per frame whether detection has to run again
+
+    reuse(frame) compares a small grayscale copy of the frame with the one
+    the cached result was computed on. Pixels that differ by more than
+    pixel_threshold count as changed; if more than changed_fraction of them
+    changed, or the cached result has been reused max_reuse times already,
+    it returns None and detection must run and be stored with store().
+    Otherwise it returns the cached (center, area).
+
+    Comparing with the reference frame (not the previous frame) means slow
+    drifts add up until they trigger a new detection.
+    """
+
+    def __init__(self, pixel_threshold=20, changed_fraction=0.001, max_reuse=15, scale=GATE_SCALE):
+        self.pixel_threshold = pixel_threshold
+        self.changed_fraction = changed_fraction
+        self.max_reuse = max_reuse
+        self.scale = scale
+
+        self.shape = None
+        self.result = None
+        self.age = 0
+        self.has_reference = False
+
+        # Counters
+        self.hits = 0
+        self.misses = 0
+
+    def bind(self, shape):
+        """Allocate the small buffers for frames of this shape"""
+        height, width = shape[:2]
+        if self.shape == (height, width):
+            return
+        self.shape = (height, width)
+        size = (max(1, width // self.scale), max(1, height // self.scale))
+        self.size = size
+        self.small = np.empty((size[1], size[0], 3), np.uint8)
+        self.current = np.empty((size[1], size[0]), np.uint8)
+        self.reference = np.empty((size[1], size[0]), np.uint8)
+        self.diff = np.empty((size[1], size[0]), np.uint8)
+        self.has_reference = False
+
+    def changed_pixels(self):
+        """Number of small-frame pixels that differ from the reference"""
+        cv2.absdiff(self.current, self.reference, dst=self.diff)
+        cv2.threshold(self.diff, self.pixel_threshold, 255, cv2.THRESH_BINARY, dst=self.diff)
+        return cv2.countNonZero(self.diff)
+
+    def reuse(self, frame):
+        """Cached (center, area) if the frame has not changed, otherwise None"""
+        self.bind(frame.shape)
+        cv2.resize(frame, self.size, dst=self.small, interpolation=cv2.INTER_LINEAR)
+        cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY, dst=self.current)
+
+        if (self.has_reference and self.result is not None and self.age < self.max_reuse
+                and self.changed_pixels() <= self.changed_fraction * self.current.size):
+            self.age += 1
+            self.hits += 1
+            return self.result
+
+        # Detection runs on this frame: it becomes the new reference
+        self.current, self.reference = self.reference, self.current
+        self.has_reference = True
+        self.result = None
+        self.age = 0
+        self.misses += 1
+        return None
+
+    def store(self, center, area):
+        """Cache the detection result for the reference frame"""
+        self.result = (center, area)
+
+    def reset(self):
+        """Force detection on the next frame (e.g. after a settings change)"""
+        self.result = None
+
+    def stats(self):
+        """Reused vs detected frame counts"""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
@@ -0,0 +1,339 @@
+"""
+Non-blocking motor command senders for the ESP32 rover
+Keep only the latest speed and send it from a background thread, either as
+HTTP requests to /control or as compact binary UDP datagrams
+"""
+
+import socket
+import struct
+import threading
+import time
+
+import requests
+
+# Binary UDP protocol (little-endian, same layout in NEW TRASH.ino)
+UDP_PORT = 4210
+COMMAND_FORMAT = "<2sIhhI"  # magic, sequence, speed A, speed B, sender timestamp (us)
+ACK_FORMAT = "<2sIBhhI"     # magic, sequence, status, applied A, applied B, echoed timestamp
+COMMAND_MAGIC = b"BM"
+ACK_MAGIC = b"BK"
+COMMAND_SIZE = struct.calcsize(COMMAND_FORMAT)  # 14 bytes
+ACK_SIZE = struct.calcsize(ACK_FORMAT)          # 15 bytes
+STATUS_APPLIED = 0
+STATUS_STALE = 1  # Older than the last applied sequence number: dropped
+
+
+def pack_command(seq, speed_a, speed_b, timestamp_us):
+    return struct.pack(COMMAND_FORMAT, COMMAND_MAGIC, seq & 0xFFFFFFFF,
+                       speed_a, speed_b, timestamp_us & 0xFFFFFFFF)
+
+
+def unpack_command(packet):
+    """(seq, speed_a, speed_b, timestamp_us), or None for anything else"""
+    if len(packet) != COMMAND_SIZE:
+        return None
+    magic, seq, speed_a, speed_b, timestamp_us = struct.unpack(COMMAND_FORMAT, packet)
+    if magic != COMMAND_MAGIC:
+        return None
+    return seq, speed_a, speed_b, timestamp_us
+
+
+def pack_ack(seq, status, speed_a, speed_b, timestamp_us):
+    return struct.pack(ACK_FORMAT, ACK_MAGIC, seq, status, speed_a, speed_b, timestamp_us)
+
+
+def unpack_ack(packet):
+    """(seq, status, speed_a, speed_b, timestamp_us), or None for anything else"""
+    if len(packet) != ACK_SIZE:
+        return None
+    magic, seq, status, speed_a, speed_b, timestamp_us = struct.unpack(ACK_FORMAT, packet)
+    if magic != ACK_MAGIC:
+        return None
+    return seq, status, speed_a, speed_b, timestamp_us
+
+
+def sequence_newer(seq, last):
+    """True when seq comes after last, allowing for 32-bit wraparound"""
+    return 0 < (seq - last) & 0xFFFFFFFF < 0x80000000
+
+
+def make_sender(esp32_ip, transport="http", udp_port=None, timeout=0.3):
+    """Motor sender for the chosen transport ("http" or "udp")"""
+    if transport == "udp":
+        # esp32_ip may carry the HTTP port (e.g. 127.0.0.1:8080 for the stub)
+        port = UDP_PORT if udp_port is None else udp_port
+        return UdpMotorSender(esp32_ip.split(":")[0], port, timeout=timeout)
+    return MotorCommandSender(esp32_ip, timeout=timeout)
+
+
+class MotorCommandSender:
+    """
+    Sends motor speeds to the ESP32 /control handler on a background thread
+
+    Only the newest command is kept: submitting a speed while another one is
+    still waiting replaces it (counted as coalesced). Both motors are set in a
+    single request over a persistent keep-alive session.
+    """
+
+    def __init__(self, esp32_ip="192.168.4.1", timeout=0.3):
+        self.url = f"http://{esp32_ip}/control"
+        self.timeout = timeout
+        self.session = requests.Session()
+
+        # Latest-value slot shared with the sender thread
+        self.condition = threading.Condition()
+        self.pending = None
+        self.running = False
+        self.thread = None
+
+        # Statistics
+        self.sent = 0
+        self.failed = 0
+        self.coalesced = 0
+        self.last_latency = None
+        self.total_latency = 0.0
+        self.max_latency = 0.0
+        self.last_ok = None
+        self.smoothed_latency = None  # Exponential moving average of round trips
+
+        # Optional callback(ok, latency_seconds) after every send, e.g. metrics
+        self.on_result = None
+
+    def start(self):
+        """Start the background sender thread"""
+        if self.thread is None:
+            self.running = True
+            self.thread = threading.Thread(target=self._send_loop, daemon=True)
+            self.thread.start()
+        return self
+
+    def submit(self, speed_a, speed_b=None):
+        """Queue a command without blocking; replaces any unsent command"""
+        if speed_b is None:
+            speed_b = speed_a
+        if self.thread is None:
+            self.start()
+        with self.condition:
+            if self.pending is not None:
+                self.coalesced += 1
+            self.pending = (int(speed_a), int(speed_b))
+            self.condition.notify()
+
+    def send_now(self, speed_a, speed_b=None):
+        """Send a command synchronously (used for stop on shutdown)"""
+        if speed_b is None:
+            speed_b = speed_a
+        with self.condition:
+            # A blocking command supersedes anything still waiting
+            self.pending = None
+        return self._send(int(speed_a), int(speed_b))
+
+    def _send(self, speed_a, speed_b):
+        start = time.perf_counter()
+        try:
+            response = self.session.get(self.url, params={'a': speed_a, 'b': speed_b},
+                                        timeout=self.timeout)
+            ok = response.status_code == 200
+        except requests.RequestException:
+            ok = False
+        latency = time.perf_counter() - start
+        self._record(ok, latency)
+        return ok
+
+    def _record(self, ok, latency):
+        """Update the statistics for one command and notify on_result"""
+        with self.condition:
+            self.last_latency = latency
+            if ok:
+                self.sent += 1
+                self.total_latency += latency
+                self.max_latency = max(self.max_latency, latency)
+                if self.smoothed_latency is None:
+                    self.smoothed_latency = latency
+                else:
+                    self.smoothed_latency += 0.2 * (latency - self.smoothed_latency)
+            else:
+                self.failed += 1
+            self.last_ok = ok
+        if self.on_result is not None:
+            self.on_result(ok, latency)
+
+    def _send_loop(self):
+        while True:
+            with self.condition:
+                while self.running and self.pending is None:
+                    self.condition.wait()
+                if not self.running:
+                    return
+                speed_a, speed_b = self.pending
+                self.pending = None
+            self._send(speed_a, speed_b)
+
+    def expected_delivery(self):
+        """Estimated seconds from send to the ESP32 acting on it (half a round trip)"""
+        return (self.smoothed_latency or 0.0) / 2
+
+    def stats(self):
+        """Per-command latency (ms) and failure counts"""
+        with self.condition:
+            avg = self.total_latency / self.sent if self.sent else 0.0
+            return {
+                "sent": self.sent,
+                "failed": self.failed,
+                "coalesced": self.coalesced,
+                "avg_latency_ms": avg * 1000,
+                "max_latency_ms": self.max_latency * 1000,
+                "last_latency_ms": (self.last_latency or 0.0) * 1000,
+            }
+
+    def stop(self):
+        """Stop the sender thread and close the HTTP session"""
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        self.session.close()
+
+
+class UdpMotorSender(MotorCommandSender):
+    """
+    Sends motor speeds as 14-byte UDP datagrams instead of HTTP requests
+
+    Each datagram carries a sequence number, both speeds and a microsecond
+    timestamp. The ESP32 applies it only if the sequence number is newer than
+    the last one it applied and answers with an acknowledgement, so late,
+    reordered packets can never override a newer speed. Sending never waits
+    for the acknowledgement: a receiver thread matches acks to commands for
+    the round-trip time and counts a command as lost (failed) when its ack
+    has not arrived within timeout. Lost commands are not retransmitted,
+    since a newer speed follows within one command interval; only
+    send_now() (the stop on shutdown) retries until acknowledged.
+    """
+
+    def __init__(self, esp32_ip="192.168.4.1", port=UDP_PORT, timeout=0.3, retries=3):
+        super().__init__(esp32_ip, timeout=timeout)
+        self.session.close()
+        self.address = (esp32_ip, port)
+        self.retries = retries
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.sock.settimeout(0.05)  # Receiver wakes up to expire lost commands
+        self.seq = 0
+        self.in_flight = {}  # seq -> send time (perf_counter)
+        self.acked_seq = None
+        self.receiver = None
+
+        # Protocol statistics on top of sent/failed
+        self.datagrams = 0
+        self.stale = 0
+
+    def start(self):
+        """Start the sender and acknowledgement receiver threads"""
+        if self.receiver is None:
+            self.running = True
+            self.receiver = threading.Thread(target=self._receive_loop, daemon=True)
+            self.receiver.start()
+        return super().start()
+
+    def _transmit(self, speed_a, speed_b):
+        """Send one datagram without waiting; returns its sequence number"""
+        now = time.perf_counter()
+        with self.condition:
+            self.seq = (self.seq + 1) & 0xFFFFFFFF
+            seq = self.seq
+            self.in_flight[seq] = now
+            self.datagrams += 1
+        packet = pack_command(seq, speed_a, speed_b, int(now * 1e6))
+        try:
+            self.sock.sendto(packet, self.address)
+        except OSError:
+            # Unreachable right now; expires as lost like a dropped datagram
+            pass
+        return seq
+
+    def _send(self, speed_a, speed_b):
+        self._transmit(speed_a, speed_b)
+        return True
+
+    def send_now(self, speed_a, speed_b=None):
+        """Send a command and wait for its acknowledgement, retrying if lost"""
+        if speed_b is None:
+            speed_b = speed_a
+        self.start()
+        with self.condition:
+            self.pending = None
+        for _ in range(self.retries):
+            seq = self._transmit(int(speed_a), int(speed_b))
+            deadline = time.monotonic() + self.timeout
+            with self.condition:
+                while not self._acknowledged(seq):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.condition.wait(remaining)
+                else:
+                    return True
+        return False
+
+    def _acknowledged(self, seq):
+        return self.acked_seq is not None and not sequence_newer(seq, self.acked_seq)
+
+    def _receive_loop(self):
+        while self.running:
+            try:
+                packet, _ = self.sock.recvfrom(64)
+            except socket.timeout:
+                packet = None
+            except OSError:
+                # Closed by stop(), or an ICMP error from an unreachable ESP32
+                if not self.running:
+                    return
+                packet = None
+            now = time.perf_counter()
+            if packet is not None:
+                self._handle_ack(packet, now)
+            self._expire(now)
+
+    def _handle_ack(self, packet, now):
+        ack = unpack_ack(packet)
+        if ack is None:
+            return
+        seq, status = ack[0], ack[1]
+        with self.condition:
+            sent_at = self.in_flight.pop(seq, None)
+            if sent_at is None:
+                return  # Already counted as lost, or a duplicate
+            if status == STATUS_STALE:
+                self.stale += 1
+            if self.acked_seq is None or sequence_newer(seq, self.acked_seq):
+                self.acked_seq = seq
+            self.condition.notify_all()
+        self._record(True, now - sent_at)
+
+    def _expire(self, now):
+        """Count commands whose acknowledgement is overdue as lost"""
+        with self.condition:
+            expired = [seq for seq, sent_at in self.in_flight.items()
+                       if now - sent_at > self.timeout]
+            for seq in expired:
+                del self.in_flight[seq]
+        for _ in expired:
+            self._record(False, self.timeout)
+
+    def stats(self):
+        """Sender statistics plus datagram, loss and out-of-order counts"""
+        stats = super().stats()
+        with self.condition:
+            stats["datagrams"] = self.datagrams
+            stats["stale"] = self.stale
+            stats["loss_rate"] = self.failed / self.datagrams if self.datagrams else 0.0
+        return stats
+
+    def stop(self):
+        """Stop both threads and close the socket"""
+        super().stop()
+        if self.receiver is not None:
+            self.receiver.join(timeout=1.0)
+            self.receiver = None
+        self.sock.close()
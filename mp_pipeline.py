@@ -0,0 +1,335 @@
+"""
+Multi-process capture / detect / control / render pipeline
+Frames travel through shared-memory ring slots; only small records use queues
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# How long a stage waits on its input queue before re-checking the stop flag
+QUEUE_POLL = 0.1
+
+
+class SharedFrameRing:
+    """
+    Fixed number of frame-sized slots in one shared memory block
+
+    The creating process owns the block and must call unlink(); workers attach
+    by name. slot(i) is a NumPy view, so frames are never copied between processes.
+    """
+
+    def __init__(self, slots, shape, name=None):
+        self.slots = slots
+        self.shape = tuple(shape)
+        self.frame_bytes = int(np.prod(self.shape))
+        self.owner = name is None
+        if self.owner:
+            self.memory = shared_memory.SharedMemory(create=True, size=slots * self.frame_bytes)
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+        self.name = self.memory.name
+        self.frames = np.ndarray((slots,) + self.shape, np.uint8, buffer=self.memory.buf)
+
+    def slot(self, index):
+        return self.frames[index]
+
+    def close(self):
+        del self.frames
+        self.memory.close()
+
+    def unlink(self):
+        if self.owner:
+            self.memory.unlink()
+
+
+def summarize(stage, durations, extra=None):
+    """Per-stage stats record sent back to the main process"""
+    stats = {"stage": stage, "count": len(durations)}
+    if durations:
+        values = np.array(durations) * 1000
+        stats.update(mean_ms=float(values.mean()),
+                     p50_ms=float(np.percentile(values, 50)),
+                     p95_ms=float(np.percentile(values, 95)))
+    if extra:
+        stats.update(extra)
+    return stats
+
+
+def capture_stage(source, ring_name, slots, shape, free_slots, detect_queue, stop, stats_queue):
+    """Read frames into free ring slots; frames are dropped when no slot is free"""
+    from capture import open_capture
+
+    ring = SharedFrameRing(slots, shape, name=ring_name)
+    cap = open_capture(source)
+    durations = []
+    dropped = 0
+    seq = 0
+    start_time = time.monotonic()
+    try:
+        while not stop.is_set():
+            ret, frame = cap.read()
+            timestamp = time.monotonic()
+            if not ret:
+                break
+
+            try:
+                index = free_slots.get_nowait()
+            except queue.Empty:
+                # Downstream is busy: drop this frame rather than queue it
+                dropped += 1
+                continue
+
+            start = time.perf_counter()
+            np.copyto(ring.slot(index), frame)
+            detect_queue.put((index, seq, timestamp))
+            durations.append(time.perf_counter() - start)
+            seq += 1
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches every process; run_pipeline reports the interrupt
+    finally:
+        detect_queue.put(None)
+        cap.release()
+        elapsed = time.monotonic() - start_time
+        stats_queue.put(summarize("capture", durations,
+                                  {"dropped": dropped, "fps": len(durations) / max(elapsed, 1e-6)}))
+        ring.close()
+
+
+def detect_stage(config, ring_name, slots, shape, free_slots, detect_queue,
+                 control_queue, render_queue, stop, stats_queue):
+    """Run blob detection directly on the shared slot"""
+    from blob_tracker import BlobTracker
+
+    ring = SharedFrameRing(slots, shape, name=ring_name)
+    tracker = BlobTracker()
+    tracker.apply_config(config)
+    durations = []
+    try:
+        while not stop.is_set():
+            try:
+                item = detect_queue.get(timeout=QUEUE_POLL)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            index, seq, timestamp = item
+            start = time.perf_counter()
+            center, area = tracker.track(ring.slot(index))
+            durations.append(time.perf_counter() - start)
+
+            record = (seq, timestamp, center, area)
+            control_queue.put(record)
+
+            # The renderer releases the slot; if it is busy, release it here
+            if render_queue is None:
+                free_slots.put(index)
+            else:
+                try:
+                    render_queue.put_nowait((index, record))
+                except queue.Full:
+                    free_slots.put(index)
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches every process; run_pipeline reports the interrupt
+    finally:
+        control_queue.put(None)
+        if render_queue is not None:
+            render_queue.put(None)
+        stats_queue.put(summarize("detect", durations))
+        ring.close()
+
+
+def control_stage(config, esp32_ip, shape, control_queue, stop, stats_queue, transport="http",
+                  udp_port=None):
+    """Turn detection records into motor commands; always stops the motors on exit"""
+    from bob import AutonomousBlobTracker
+
+    tracker = AutonomousBlobTracker(esp32_ip, check_connection=False, transport=transport,
+                                    udp_port=udp_port)
+    tracker.apply_config(config)
+    durations = []
+    latencies = []
+    try:
+        while not stop.is_set():
+            try:
+                record = control_queue.get(timeout=QUEUE_POLL)
+            except queue.Empty:
+                continue
+            if record is None:
+                break
+
+            seq, timestamp, center, area = record
+            start = time.perf_counter()
+            motor_speed, command = tracker.calculate_motor_speed(center, shape)
+
+            # Send command to ESP32 (with rate limiting)
+            current_time = time.time()
+            if current_time - tracker.last_command_time >= tracker.command_interval:
+                if tracker.send_motor_command(motor_speed):
+                    tracker.last_command_time = current_time
+                    # Camera-to-command latency for commands that went out
+                    latencies.append(time.monotonic() - timestamp)
+            durations.append(time.perf_counter() - start)
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches every process; run_pipeline reports the interrupt
+    finally:
+        tracker.send_motor_command(0, blocking=True)
+        tracker.motor_sender.stop()
+        extra = {"commands": len(latencies)}
+        if latencies:
+            values = np.array(latencies) * 1000
+            extra.update(latency_p50_ms=float(np.percentile(values, 50)),
+                         latency_p95_ms=float(np.percentile(values, 95)))
+        extra.update(tracker.motor_sender.stats())
+        stats_queue.put(summarize("control", durations, extra))
+
+
+def render_stage(config, ring_name, slots, shape, free_slots, render_queue, stop, stats_queue):
+    """Draw the overlay on the shared slot and show it; 'q' stops the pipeline"""
+    import cv2
+    from bob import AutonomousBlobTracker
+
+    ring = SharedFrameRing(slots, shape, name=ring_name)
+    tracker = AutonomousBlobTracker("0.0.0.0", check_connection=False, transport=None)
+    tracker.apply_config(config)
+    durations = []
+    try:
+        while not stop.is_set():
+            try:
+                item = render_queue.get(timeout=QUEUE_POLL)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+
+            index, (seq, timestamp, center, area) = item
+            start = time.perf_counter()
+            frame = ring.slot(index)
+            motor_speed, command = tracker.calculate_motor_speed(center, shape)
+            tracker.draw_overlay(frame, center, area, command, motor_speed)
+            cv2.imshow('Autonomous Blob Tracker', frame)
+            free_slots.put(index)
+            durations.append(time.perf_counter() - start)
+
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                stop.set()
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches every process; run_pipeline reports the interrupt
+    finally:
+        cv2.destroyAllWindows()
+        stats_queue.put(summarize("render", durations))
+        ring.close()
+
+
+def probe_frame_shape(source):
+    """Read one frame to learn the shape used for the ring slots"""
+    from capture import open_capture
+
+    cap = open_capture(source)
+    ret, frame = cap.read()
+    cap.release()
+    if not ret:
+        return None
+    return frame.shape
+
+
+def print_report(stats, elapsed):
+    """Throughput and latency for each stage"""
+    print("\n=== Pipeline report ===")
+    for name in ("capture", "detect", "control", "render"):
+        stage = stats.get(name)
+        if stage is None:
+            continue
+        line = f"{name:<8} {stage['count']:>6} items  {stage['count'] / max(elapsed, 1e-6):6.1f}/s"
+        if "mean_ms" in stage:
+            line += f"  mean {stage['mean_ms']:.2f}ms  p95 {stage['p95_ms']:.2f}ms"
+        if name == "capture":
+            line += f"  dropped {stage['dropped']}"
+        if name == "control" and "latency_p50_ms" in stage:
+            line += (f"  camera-to-command p50 {stage['latency_p50_ms']:.1f}ms"
+                     f" p95 {stage['latency_p95_ms']:.1f}ms  sent {stage['sent']} failed {stage['failed']}")
+        print(line)
+
+
+def run_pipeline(source, esp32_ip, config, render=True, slots=4, duration=None, transport="http",
+                 udp_port=None):
+    """
+    Run capture, detection, control and (optionally) rendering in separate processes
+
+    Stops when the source ends, 'q' is pressed in the preview, Ctrl+C is hit
+    or duration seconds have passed. The motors are always sent a stop command.
+    Returns the per-stage stats dictionary.
+    """
+    shape = probe_frame_shape(source)
+    if shape is None:
+        print("❌ Error: Could not read from camera")
+        return {}
+
+    ring = SharedFrameRing(slots, shape)
+    free_slots = mp.Queue()
+    for index in range(slots):
+        free_slots.put(index)
+    detect_queue = mp.Queue()
+    control_queue = mp.Queue()
+    render_queue = mp.Queue(maxsize=1) if render else None
+    stats_queue = mp.Queue()
+    stop = mp.Event()
+
+    workers = [
+        mp.Process(target=capture_stage, name="capture",
+                   args=(source, ring.name, slots, shape, free_slots, detect_queue, stop, stats_queue)),
+        mp.Process(target=detect_stage, name="detect",
+                   args=(config, ring.name, slots, shape, free_slots, detect_queue,
+                         control_queue, render_queue, stop, stats_queue)),
+        mp.Process(target=control_stage, name="control",
+                   args=(config, esp32_ip, shape, control_queue, stop, stats_queue,
+                         transport, udp_port)),
+    ]
+    if render:
+        workers.append(mp.Process(target=render_stage, name="render",
+                                  args=(config, ring.name, slots, shape, free_slots,
+                                        render_queue, stop, stats_queue)))
+
+    start_time = time.monotonic()
+    for worker in workers:
+        worker.start()
+
+    stats = {}
+    try:
+        # Wait for the stages to finish (source ended or 'q' pressed)
+        while any(worker.is_alive() for worker in workers):
+            if duration is not None and time.monotonic() - start_time >= duration:
+                break
+            time.sleep(QUEUE_POLL)
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Keyboard interrupt - Stopping pipeline...")
+    finally:
+        stop.set()
+        elapsed = time.monotonic() - start_time
+        deadline = time.monotonic() + 3.0
+        while len(stats) < len(workers) and time.monotonic() < deadline:
+            try:
+                stage = stats_queue.get(timeout=QUEUE_POLL)
+                stats[stage["stage"]] = stage
+            except queue.Empty:
+                pass
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+
+        # The control stage stops the motors itself; repeat it in case it crashed
+        from motor_sender import make_sender
+        sender = make_sender(esp32_ip, transport, udp_port)
+        sender.send_now(0)
+        sender.stop()
+
+        ring.close()
+        ring.unlink()
+
+    print_report(stats, elapsed)
+    return stats
@@ -0,0 +1,266 @@
+"""
+Concurrent multi-camera tracking for the rover
+Each camera captures and detects in its own process; the main process
+time-aligns the per-camera results into one fused target that drives the motors
+"""
+
+import multiprocessing as mp
+import queue
+import time
+from collections import deque, namedtuple
+
+import numpy as np
+
+from mp_pipeline import QUEUE_POLL, summarize
+
+# One detection from one camera; center is in that camera's pixels (None when
+# lost). A result with seq None marks the end of the camera's source.
+CameraResult = namedtuple("CameraResult", ["camera", "seq", "timestamp", "center", "area", "shape"])
+
+# Fused estimate in reference-camera pixels; skew is the spread of the
+# capture timestamps that went into it
+FusedTarget = namedtuple("FusedTarget", ["timestamp", "center", "area", "cameras", "skew"])
+
+
+def camera_stage(camera, source, config, results, stop, stats_queue, realtime=False):
+    """Capture and detect for one camera; sends a CameraResult per processed frame"""
+    import cv2
+    from blob_tracker import BlobTracker
+    from capture import LatestFrameSource, is_live_source, open_capture
+
+    try:
+        cap = open_capture(source, realtime=realtime)
+    except OSError:
+        cap = None
+    if cap is None or not cap.isOpened():
+        # Report the failure and end this camera; the others keep tracking
+        print(f"❌ Error: camera{camera} could not open {source}")
+        results.put(CameraResult(camera, None, None, None, 0, None))
+        stats_queue.put(summarize(f"camera{camera}", [], {"camera": camera, "source": str(source),
+                                                          "fps": 0.0, "opened": False}))
+        return
+
+    cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    cap.set(cv2.CAP_PROP_FPS, 30)
+    cap = LatestFrameSource(cap, drop_frames=is_live_source(source) or realtime).start()
+
+    tracker = BlobTracker()
+    tracker.apply_config(config)
+    durations = []
+    start_time = time.monotonic()
+    try:
+        while not stop.is_set():
+            captured = cap.read_latest(timeout=QUEUE_POLL)
+            if captured is None:
+                if cap.finished:
+                    break
+                continue
+
+            start = time.perf_counter()
+            center, area = tracker.track(captured.frame)
+            durations.append(time.perf_counter() - start)
+            results.put(CameraResult(camera, captured.seq, captured.timestamp, center, area,
+                                     captured.frame.shape[:2]))
+    except KeyboardInterrupt:
+        pass  # Ctrl+C reaches every process; the main process shuts down
+    finally:
+        results.put(CameraResult(camera, None, None, None, 0, None))
+        elapsed = time.monotonic() - start_time
+        extra = {"camera": camera, "source": str(source), "fps": len(durations) / max(elapsed, 1e-6),
+                 "opened": True}
+        extra.update(cap.stats())
+        cap.release()
+        stats_queue.put(summarize(f"camera{camera}", durations, extra))
+
+
+class TargetFuser:
+    """
+    Time-aligns the newest result of every camera into one target estimate
+
+    The cameras are assumed to see the scene from roughly the same place
+    (redundant or side-by-side views), so positions are fused in normalised
+    image coordinates and weighted by the blob's share of the frame. The
+    fusion time is the newest capture timestamp. Each camera's position is
+    moved to that time along its last two detections. Cameras whose newest
+    frame is more than max_skew seconds older are left out.
+    """
+
+    def __init__(self, reference_shape, max_skew=0.05):
+        self.reference_shape = reference_shape
+        self.max_skew = max_skew
+        self.history = {}
+        self.skews = []
+
+    def add(self, result):
+        self.history.setdefault(result.camera, deque(maxlen=2)).append(result)
+
+    def aligned(self, history, timestamp):
+        """Normalised (x, y) and area share of one camera at timestamp, or None"""
+        last = history[-1]
+        if last.center is None:
+            return None
+        height, width = last.shape
+        x, y = last.center[0] / width, last.center[1] / height
+        previous = history[0]
+        if previous.center is not None and last.timestamp > previous.timestamp:
+            # Constant velocity over at most max_skew, and never further ahead
+            # than the last frame interval (close frames would overshoot)
+            rate = min((timestamp - last.timestamp) / (last.timestamp - previous.timestamp), 1.0)
+            x += (x - previous.center[0] / width) * rate
+            y += (y - previous.center[1] / height) * rate
+        return x, y, last.area / (width * height)
+
+    def fuse(self):
+        """FusedTarget from the newest results, or None before any arrived"""
+        latest = [history[-1] for history in self.history.values()]
+        if not latest:
+            return None
+        timestamp = max(result.timestamp for result in latest)
+        fresh = [camera for camera, history in self.history.items()
+                 if timestamp - history[-1].timestamp <= self.max_skew]
+        skew = timestamp - min(self.history[camera][-1].timestamp for camera in fresh)
+        self.skews.append(skew)
+
+        points = [point for point in (self.aligned(self.history[camera], timestamp) for camera in fresh)
+                  if point is not None]
+        if not points:
+            return FusedTarget(timestamp, None, 0, fresh, skew)
+        points = np.array(points)
+        weights = points[:, 2]
+        x, y = weights @ points[:, :2] / weights.sum()
+        height, width = self.reference_shape[:2]
+        center = (int(min(max(x, 0.0), 1.0) * (width - 1)), int(min(max(y, 0.0), 1.0) * (height - 1)))
+        return FusedTarget(timestamp, center, int(weights.mean() * width * height), fresh, skew)
+
+    def skew_stats(self):
+        """p50/p95/max sync skew of the fused estimates in milliseconds"""
+        if not self.skews:
+            return {}
+        values = np.array(self.skews) * 1000
+        return {"skew_p50_ms": float(np.percentile(values, 50)),
+                "skew_p95_ms": float(np.percentile(values, 95)),
+                "skew_max_ms": float(values.max())}
+
+
+def print_report(stats, fusion, elapsed):
+    """Per-camera throughput and the fusion's sync skew"""
+    print("\n=== Multi-camera report ===")
+    for name in sorted(name for name in stats if name.startswith("camera")):
+        camera = stats[name]
+        if not camera["opened"]:
+            print(f"{name:<9} {camera['source']:<20} could not be opened")
+            continue
+        line = f"{name:<9} {camera['source']:<20} {camera['count']:>6} frames  {camera['fps']:6.1f} fps"
+        if "mean_ms" in camera:
+            line += f"  detect mean {camera['mean_ms']:.2f}ms p95 {camera['p95_ms']:.2f}ms"
+        line += f"  dropped {camera['dropped']}"
+        print(line)
+    line = f"fusion    {fusion['estimates']:>6} estimates  {fusion['estimates'] / max(elapsed, 1e-6):6.1f}/s"
+    if "skew_p50_ms" in fusion:
+        line += (f"  sync skew p50 {fusion['skew_p50_ms']:.1f}ms p95 {fusion['skew_p95_ms']:.1f}ms"
+                 f" max {fusion['skew_max_ms']:.1f}ms")
+    print(line)
+    print(f"control   sent {fusion['sent']} failed {fusion['failed']}")
+
+
+def run_multicam(sources, esp32_ip, config, duration=None, max_skew=0.05, realtime=False,
+                 transport="http", udp_port=None):
+    """
+    Track with one process per camera and steer on the fused target
+
+    Sources are anything capture.open_capture accepts, so recordings, video
+    files or 'synthetic' stand in for real devices. The frame shape of the
+    first result to arrive, from any camera, is the reference for
+    calculate_motor_speed, so a camera that fails to open or ends early does
+    not hold up the others. Stops when every
+    source has ended, Ctrl+C is hit or duration seconds have passed; the
+    motors are always sent a stop command. Returns the stats dictionary.
+    """
+    from bob import AutonomousBlobTracker
+
+    tracker = AutonomousBlobTracker(esp32_ip, check_connection=False, transport=transport,
+                                    udp_port=udp_port)
+    tracker.apply_config(config)
+    results = mp.Queue()
+    stats_queue = mp.Queue()
+    stop = mp.Event()
+    workers = [mp.Process(target=camera_stage, name=f"camera{camera}",
+                          args=(camera, source, config, results, stop, stats_queue, realtime))
+               for camera, source in enumerate(sources)]
+
+    start_time = time.monotonic()
+    for worker in workers:
+        worker.start()
+    print(f"✓ Tracking with {len(sources)} cameras")
+
+    fuser = None
+    estimates = 0
+    ended = set()
+    report_time = time.time()
+    estimates_since_report = 0
+    command = "STOP - Lost tracking"
+    stats = {}
+    try:
+        while len(ended) < len(workers):
+            if duration is not None and time.monotonic() - start_time >= duration:
+                break
+            try:
+                result = results.get(timeout=QUEUE_POLL)
+            except queue.Empty:
+                continue
+            if result.seq is None:
+                ended.add(result.camera)
+                continue
+
+            if fuser is None:
+                # Positions are fused normalised, so any camera can set the reference
+                fuser = TargetFuser(result.shape, max_skew)
+            fuser.add(result)
+            target = fuser.fuse()
+            estimates += 1
+            estimates_since_report += 1
+
+            motor_speed, command = tracker.calculate_motor_speed(target.center, fuser.reference_shape)
+            current_time = time.time()
+            if current_time - tracker.last_command_time >= tracker.command_interval:
+                if tracker.send_motor_command(motor_speed):
+                    tracker.last_command_time = current_time
+
+            if current_time - report_time >= 1.0:
+                rate = estimates_since_report / (current_time - report_time)
+                print(f"{rate:5.1f} estimates/s | {len(target.cameras)} cameras | {command}")
+                estimates_since_report = 0
+                report_time = current_time
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Keyboard interrupt - Stopping cameras...")
+    finally:
+        stop.set()
+        tracker.send_motor_command(0, blocking=True)
+        tracker.motor_sender.stop()
+        elapsed = time.monotonic() - start_time
+        deadline = time.monotonic() + 3.0
+        while len(stats) < len(workers) and time.monotonic() < deadline:
+            try:
+                camera = stats_queue.get(timeout=QUEUE_POLL)
+                stats[camera["stage"]] = camera
+            except queue.Empty:
+                pass
+        # Unread results would keep the workers' queue feeder threads alive
+        while True:
+            try:
+                results.get_nowait()
+            except queue.Empty:
+                break
+        for worker in workers:
+            worker.join(timeout=1.0)
+            if worker.is_alive():
+                worker.terminate()
+
+    fusion = {"estimates": estimates}
+    if fuser is not None:
+        fusion.update(fuser.skew_stats())
+    fusion.update(tracker.motor_sender.stats())
+    stats["fusion"] = fusion
+    print_report(stats, fusion, elapsed)
+    return stats
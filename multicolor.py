@@ -0,0 +1,138 @@
+"""
+Single-pass multi-color blob tracking
+Every configured HSV range is labelled in one lookup-table pass per frame
+"""
+
+from collections import namedtuple
+
+import cv2
+import numpy as np
+
+from centroid import centroid_from_sums
+from pipeline import MORPH_KERNEL, FramePipeline
+from settings import Settings
+
+# One color to track; hue ranges with lower > upper wrap past 179
+ColorTarget = namedtuple("ColorTarget", [
+    "name", "lower_hsv", "upper_hsv", "min_blob_area", "max_blob_area",
+])
+
+# Per-color result for one frame (center is None when not found)
+ColorBlob = namedtuple("ColorBlob", ["name", "center", "area"])
+
+# Each target gets one bit of the 8-bit label image
+MAX_TARGETS = 8
+
+
+def targets_from_presets(names=None, min_blob_area=500, max_blob_area=50000):
+    """ColorTargets for Settings presets (all presets when names is None)"""
+    presets = Settings.list_saved_presets()
+    if names is None:
+        names = list(presets)
+    targets = []
+    for name in names:
+        if name not in presets:
+            raise ValueError(f"Unknown preset: {name} (choose from {', '.join(presets)})")
+        preset = presets[name]
+        targets.append(ColorTarget(name, tuple(preset["lower_hsv"]), tuple(preset["upper_hsv"]),
+                                   min_blob_area, max_blob_area))
+    return targets
+
+
+def channel_tables(targets):
+    """
+    1x256 lookup tables for H, S and V: bit i is set where target i accepts the value
+
+    A pixel belongs to target i when bit i survives ANDing its three table entries.
+    """
+    values = np.arange(256)
+    tables = np.zeros((3, 256), np.uint8)
+    for bit, target in enumerate(targets):
+        for channel in range(3):
+            low, high = target.lower_hsv[channel], target.upper_hsv[channel]
+            if channel == 0 and low > high:
+                # Hue wraps: 170..10 means 170..179 or 0..10
+                accepted = (values >= low) | (values <= high)
+            else:
+                accepted = (values >= low) & (values <= high)
+            tables[channel, accepted] |= 1 << bit
+    return [table.reshape(1, 256) for table in tables]
+
+
+class MultiColorDetector:
+    """
+    Tracks up to 8 colors with one HSV conversion per frame
+
+    The frame is converted to HSV once and each channel goes through a lookup
+    table that holds one bit per target. ANDing the three planes gives a label
+    image in which bit i marks the pixels of target i, so all ranges are
+    tested in a single pass and overlapping ranges stay exact. Per color only
+    a cheap bit test, noise removal on the color's bounding box and the
+    running-sum centroid remain, so N colors cost far less than N full
+    pipelines.
+    """
+
+    def __init__(self, targets, noise_removal=True):
+        targets = list(targets)
+        if not 1 <= len(targets) <= MAX_TARGETS:
+            raise ValueError(f"Between 1 and {MAX_TARGETS} color targets are supported")
+        self.targets = targets
+        self.noise_removal = noise_removal
+        self.tables = channel_tables(targets)
+        self.pipeline = FramePipeline()
+        self.shape = None
+
+    def bind(self, shape):
+        """Allocate the label buffers for frames of this shape"""
+        height, width = shape[:2]
+        self.pipeline.bind(shape)
+        if self.shape == (height, width):
+            return
+        self.shape = (height, width)
+        self.planes = [np.empty((height, width), np.uint8) for _ in range(3)]
+        self.labels = np.empty((height, width), np.uint8)
+        self.color_mask = np.empty((height, width), np.uint8)
+
+    def label(self, frame):
+        """Label image: bit i set where the pixel is inside target i's range"""
+        self.bind(frame.shape)
+        hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV, dst=self.pipeline.hsv)
+        cv2.split(hsv, self.planes)
+        for plane, table in zip(self.planes, self.tables):
+            cv2.LUT(plane, table, dst=plane)
+        cv2.bitwise_and(self.planes[0], self.planes[1], dst=self.labels)
+        return cv2.bitwise_and(self.labels, self.planes[2], dst=self.labels)
+
+    def mask(self, bit):
+        """0/255 mask of one target from the current label image"""
+        cv2.bitwise_and(self.labels, 1 << bit, dst=self.color_mask)
+        return cv2.threshold(self.color_mask, 0, 255, cv2.THRESH_BINARY, dst=self.color_mask)[1]
+
+    def detect(self, frame):
+        """List of ColorBlob records, one per target in configuration order"""
+        self.label(frame)
+        results = []
+        for bit, target in enumerate(self.targets):
+            area, sum_x, sum_y = self.color_sums(self.mask(bit))
+            center, area = centroid_from_sums(area, sum_x, sum_y,
+                                              target.min_blob_area, target.max_blob_area)
+            results.append(ColorBlob(target.name, center, area))
+        return results
+
+    def color_sums(self, mask):
+        """(area, sum_x, sum_y) of one color mask, after optional noise removal"""
+        if not self.noise_removal:
+            return self.pipeline.sums(mask)
+
+        # Opening and closing only change pixels within a kernel of set
+        # pixels, so morphology on the padded bounding box is exact
+        x, y, width, height = cv2.boundingRect(mask)
+        if width == 0:
+            return 0, 0, 0
+        pad = MORPH_KERNEL.shape[0]
+        x0, y0 = max(x - pad, 0), max(y - pad, 0)
+        x1 = min(x + width + pad, mask.shape[1])
+        y1 = min(y + height + pad, mask.shape[0])
+        cleaned = self.pipeline.remove_noise(mask[y0:y1, x0:x1], MORPH_KERNEL)
+        area, sum_x, sum_y = self.pipeline.sums(cleaned)
+        return area, sum_x + x0 * area, sum_y + y0 * area
@@ -0,0 +1,122 @@
+"""
+Predictive centroid tracking for latency compensation
+A Kalman filter on the blob centroid that can extrapolate to a future time
+"""
+
+import numpy as np
+
+# Filter models: number of derivatives tracked per axis
+MODELS = {"velocity": 2, "acceleration": 3}
+
+
+class CentroidKalman:
+    """
+    Constant-velocity or constant-acceleration Kalman filter on (x, y)
+
+    Timestamps are in seconds (time.monotonic, as in CapturedFrame), so frames
+    do not need to be evenly spaced. update() takes the detected center, or
+    None on a missed or skipped frame, in which case the filter coasts on its
+    motion model. After max_coast seconds without a detection it resets and
+    returns None like a lost track. predict(t) extrapolates the position to
+    any later time, e.g. when the next motor command reaches the ESP32.
+
+    process_noise is the spectral density of the unmodelled derivative
+    (px/s^2 for velocity, px/s^3 for acceleration); measurement_noise is the
+    centroid jitter in pixels.
+    """
+
+    def __init__(self, model="velocity", process_noise=2000.0, measurement_noise=3.0,
+                 max_coast=0.5):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model: {model} (choose from {', '.join(MODELS)})")
+        self.model = model
+        self.order = MODELS[model]
+        self.process_noise = process_noise
+        self.max_coast = max_coast
+
+        # State layout: [x, vx, (ax), y, vy, (ay)]
+        self.H = np.zeros((2, 2 * self.order))
+        self.H[0, 0] = 1.0
+        self.H[1, self.order] = 1.0
+        self.R = np.eye(2) * measurement_noise ** 2
+
+        self.reset()
+
+    def reset(self):
+        """Forget the track"""
+        self.state = None
+        self.P = None
+        self.timestamp = None
+        self.last_seen = None
+
+    @property
+    def coasting(self):
+        """True when the latest update had no detection"""
+        return self.state is not None and self.last_seen != self.timestamp
+
+    def transition(self, dt):
+        """State transition matrix for a time step of dt seconds"""
+        axis = np.eye(self.order)
+        axis[0, 1] = dt
+        if self.order == 3:
+            axis[0, 2] = dt * dt / 2
+            axis[1, 2] = dt
+        return np.kron(np.eye(2), axis)
+
+    def process_covariance(self, dt):
+        """Discrete white-noise covariance on the highest derivative"""
+        if self.order == 2:
+            gain = np.array([dt * dt / 2, dt])
+        else:
+            gain = np.array([dt ** 3 / 6, dt * dt / 2, dt])
+        axis = np.outer(gain, gain) * self.process_noise ** 2
+        return np.kron(np.eye(2), axis)
+
+    def update(self, center, timestamp):
+        """
+        Advance the filter to timestamp and fold in center (or coast if None)
+        Returns the filtered (x, y) position, or None when there is no track
+        """
+        if self.state is None:
+            if center is None:
+                return None
+            # Start at the detection with unknown motion
+            self.state = np.zeros(2 * self.order)
+            self.state[0], self.state[self.order] = center
+            variances = [self.R[0, 0]] + [1e6 * 10 ** i for i in range(self.order - 1)]
+            self.P = np.diag(variances * 2)
+            self.timestamp = self.last_seen = timestamp
+            return self.position()
+
+        dt = timestamp - self.timestamp
+        if dt > 0:
+            F = self.transition(dt)
+            self.state = F @ self.state
+            self.P = F @ self.P @ F.T + self.process_covariance(dt)
+            self.timestamp = timestamp
+
+        if center is not None:
+            innovation = np.asarray(center, dtype=np.float64) - self.H @ self.state
+            S = self.H @ self.P @ self.H.T + self.R
+            K = self.P @ self.H.T @ np.linalg.inv(S)
+            self.state = self.state + K @ innovation
+            self.P = (np.eye(len(self.state)) - K @ self.H) @ self.P
+            self.last_seen = timestamp
+        elif timestamp - self.last_seen > self.max_coast:
+            self.reset()
+            return None
+
+        return self.position()
+
+    def position(self):
+        """Current filtered (x, y) in pixels, or None"""
+        if self.state is None:
+            return None
+        return int(round(self.state[0])), int(round(self.state[self.order]))
+
+    def predict(self, timestamp):
+        """Extrapolated (x, y) at a future timestamp without changing the filter"""
+        if self.state is None:
+            return None
+        state = self.transition(max(timestamp - self.timestamp, 0.0)) @ self.state
+        return int(round(state[0])), int(round(state[self.order]))
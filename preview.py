@@ -0,0 +1,152 @@
+"""
+Preview rendering decoupled from the control loop
+A rate-limited main-thread preview window plus a cache for the static overlay layer
+"""
+
+import collections
+import threading
+import time
+
+import cv2
+import numpy as np
+
+# Default preview rate; control keeps running at camera rate
+PREVIEW_FPS = 10
+
+
+class StaticOverlayCache:
+    """
+    Pre-rendered layer for overlay elements that only change with the settings
+
+    draw(layer) draws the static elements (center line, dead zone, ...) once
+    onto a blank layer. The layer is rebuilt only when the frame size or the
+    key (e.g. dead_zone) changes, and is composited with a single cv2.copyTo.
+    """
+
+    def __init__(self):
+        self.key = None
+        self.layer = None
+        self.mask = None
+        self.builds = 0
+
+    def apply(self, frame, key, draw):
+        """Composite the cached layer onto frame in place"""
+        cache_key = (frame.shape, key)
+        if cache_key != self.key:
+            self.layer = np.zeros(frame.shape, np.uint8)
+            draw(self.layer)
+            self.mask = cv2.cvtColor(self.layer, cv2.COLOR_BGR2GRAY)
+            # Every drawn pixel is copied, including dark colours
+            cv2.threshold(self.mask, 0, 255, cv2.THRESH_BINARY, dst=self.mask)
+            self.key = cache_key
+            self.builds += 1
+        cv2.copyTo(self.layer, self.mask, frame)
+        return frame
+
+
+class PreviewWindow:
+    """
+    Shows the newest submitted frame in a window at most fps times a second
+
+    HighGUI (window and trackbar creation, imshow, waitKey, trackbar reads)
+    stays on the main thread, which OpenCV requires on macOS. run(work)
+    therefore moves the tracking loop to a worker thread and runs the preview
+    loop here: setup() runs once at start and poll() after every waitKey.
+    The worker calls submit(frame, *overlay_args) and never waits on drawing,
+    imshow or waitKey; key presses are queued for it to pick up with
+    read_key(), and it should return once running is False.
+    """
+
+    def __init__(self, window_name, draw, fps=PREVIEW_FPS, setup=None, poll=None, metrics=None):
+        self.window_name = window_name
+        self.draw = draw
+        self.interval = 1.0 / fps if fps else 0.0
+        self.setup = setup
+        self.poll = poll
+        self.metrics = metrics
+
+        self.lock = threading.Lock()
+        self.pending = None
+        self.keys = collections.deque()
+        self.running = False
+        self.error = None
+
+        # Statistics
+        self.rendered = 0
+        self.skipped = 0
+        self.render_time = 0.0
+
+    def submit(self, frame, *overlay_args):
+        """Hand over the latest frame; replaces a frame that was not shown yet"""
+        with self.lock:
+            if self.pending is not None:
+                self.skipped += 1
+            self.pending = (frame, overlay_args)
+
+    def read_key(self):
+        """Next key pressed in the preview window, or -1"""
+        try:
+            return self.keys.popleft()
+        except IndexError:
+            return -1
+
+    def run(self, work):
+        """
+        Run work() on a worker thread and the preview on this (main) thread
+
+        Returns when work returns. An exception raised by work is re-raised
+        here; on Ctrl+C running is cleared, the worker is joined and the
+        KeyboardInterrupt propagates.
+        """
+        if self.setup is not None:
+            self.setup()
+        self.running = True
+        worker = threading.Thread(target=self._work, args=(work,), name="tracking", daemon=True)
+        worker.start()
+        next_render = time.monotonic()
+        try:
+            while worker.is_alive():
+                now = time.monotonic()
+                item = None
+                if now >= next_render:
+                    with self.lock:
+                        item, self.pending = self.pending, None
+
+                if item is not None:
+                    start = time.perf_counter()
+                    frame, overlay_args = item
+                    self.draw(frame, *overlay_args)
+                    cv2.imshow(self.window_name, frame)
+                    self.render_time += time.perf_counter() - start
+                    self.rendered += 1
+                    next_render = max(next_render + self.interval, now)
+                    if self.metrics is not None:
+                        self.metrics.observe_stage("preview", time.perf_counter() - start)
+
+                # waitKey also keeps the windows responsive between frames
+                key = cv2.waitKey(1 if item is not None else 5) & 0xFF
+                if key != 0xFF:
+                    self.keys.append(key)
+                if self.poll is not None:
+                    self.poll()
+        finally:
+            self.running = False
+            worker.join()
+            cv2.destroyAllWindows()
+        if self.error is not None:
+            raise self.error
+
+    def _work(self, work):
+        try:
+            work()
+        except BaseException as e:
+            self.error = e
+
+    def stats(self):
+        """Frames shown, frames replaced before being shown, average render time"""
+        avg = self.render_time / self.rendered if self.rendered else 0.0
+        return {
+            "rendered": self.rendered,
+            "skipped": self.skipped,
+            "avg_render_ms": avg * 1000,
+        }
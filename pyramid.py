@@ -0,0 +1,46 @@
+"""
+Multi-resolution (pyramid) blob detection helpers
+Large blobs are thresholded at 1/2 or 1/4 scale and mapped back to full resolution
+"""
+
+import numpy as np
+
+# Reduced scales to try, coarsest first
+PYRAMID_SCALES = (4, 2)
+# A blob must keep at least this many pixels at the reduced scale
+MIN_SCALED_BLOB_AREA = 256
+# Morphology kernel used at reduced scales (5x5 at full resolution)
+SCALED_KERNEL = np.ones((3, 3), np.uint8)
+
+
+def choose_scale(last_area, min_blob_area):
+    """
+    Downscale factor (4, 2 or 1) for the next detection
+
+    Uses the last blob area while tracking, or min_blob_area when the blob is
+    lost, and picks the coarsest scale that still leaves the blob with
+    MIN_SCALED_BLOB_AREA pixels. Small targets stay at full resolution.
+    """
+    reference = last_area if last_area > 0 else min_blob_area
+    for scale in PYRAMID_SCALES:
+        if reference / (scale * scale) >= MIN_SCALED_BLOB_AREA:
+            return scale
+    return 1
+
+
+def scaled_centroid(area, sum_x, sum_y, scale, min_area, max_area):
+    """
+    Map mask sums measured at a reduced scale back to full resolution
+    Each reduced pixel covers scale x scale full-resolution pixels
+    """
+    if area == 0:
+        return None, 0
+
+    full_area = area * scale * scale
+    if full_area < min_area or full_area > max_area:
+        return None, 0
+
+    # Reduced pixel i was sampled from full-resolution pixel i * scale
+    avg_x = int(sum_x * scale / area)
+    avg_y = int(sum_y * scale / area)
+    return (avg_x, avg_y), full_area
@@ -0,0 +1,215 @@
+"""
+Raw frame recording and replay for Blob Tracker
+Frames and capture timestamps go to a fixed-stride memory-mapped file that is
+replayed through np.memmap views, without decoding or copying
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# File extension recognised by capture.open_capture
+RECORDING_SUFFIX = ".frames"
+
+MAGIC = b"BLOBREC1"
+HEADER_SIZE = 64
+HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("height", "<u4"),
+    ("width", "<u4"),
+    ("channels", "<u4"),
+    ("count", "<u8"),   # Frames written so far, updated on every append
+])
+
+
+def record_dtype(shape):
+    """One fixed-stride record: capture timestamp followed by the raw frame"""
+    return np.dtype([("timestamp", "<f8"), ("frame", np.uint8, tuple(shape))])
+
+
+def is_recording(source):
+    return isinstance(source, str) and source.endswith(RECORDING_SUFFIX)
+
+
+class FrameRecorder:
+    """
+    Appends raw frames and capture timestamps to a memory-mapped file
+
+    Every record has the same size, so frame i lives at a fixed offset. The
+    file grows chunk_frames records at a time and is trimmed on close(). The
+    frame count in the header is updated after every frame, so a recording
+    cut short by a crash stays readable up to the last complete frame.
+    """
+
+    def __init__(self, path, shape, chunk_frames=300):
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+        self.path = path
+        self.shape = tuple(shape)
+        self.chunk_frames = chunk_frames
+        self.dtype = record_dtype(self.shape)
+        self.count = 0
+        self.capacity = 0
+
+        header = np.zeros(1, HEADER_DTYPE)
+        header["magic"] = MAGIC
+        header["height"], header["width"], header["channels"] = self.shape
+        with open(path, "wb") as f:
+            f.write(header.tobytes().ljust(HEADER_SIZE, b"\0"))
+        self.header = np.memmap(path, HEADER_DTYPE, "r+", shape=(1,))
+        self.records = None
+        self.grow()
+
+    def grow(self):
+        """Extend the file by chunk_frames records and remap it"""
+        if self.records is not None:
+            self.records.flush()
+        self.capacity += self.chunk_frames
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.capacity * self.dtype.itemsize)
+        self.records = np.memmap(self.path, self.dtype, "r+", offset=HEADER_SIZE,
+                                 shape=(self.capacity,))
+        self.frames = self.records["frame"]
+        self.timestamps = self.records["timestamp"]
+
+    def append(self, frame, timestamp=None):
+        """Write one frame (copied once, into the mapping)"""
+        if frame.shape[:2] != self.shape[:2] or frame.size != np.prod(self.shape):
+            raise ValueError(f"Frame shape {frame.shape} does not match recording shape {self.shape}")
+        if self.count == self.capacity:
+            self.grow()
+        np.copyto(self.frames[self.count], frame.reshape(self.shape))
+        self.timestamps[self.count] = time.monotonic() if timestamp is None else timestamp
+        self.count += 1
+        self.header["count"] = self.count
+
+    def close(self):
+        """Flush and trim the file to the frames actually written"""
+        if self.records is None:
+            return
+        self.records.flush()
+        self.header.flush()
+        del self.frames, self.timestamps
+        self.records = self.header = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.count * self.dtype.itemsize)
+
+
+class RecordingSource:
+    """
+    Wraps a capture object and records every frame it returns
+
+    The recorder is created on the first frame, once the frame shape is known.
+    """
+
+    def __init__(self, capture, path):
+        self.capture = capture
+        self.path = path
+        self.recorder = None
+
+    def isOpened(self):
+        return self.capture.isOpened()
+
+    def set(self, prop, value):
+        return self.capture.set(prop, value)
+
+    def get(self, prop):
+        return self.capture.get(prop)
+
+    def read(self):
+        ret, frame = self.capture.read()
+        if ret:
+            timestamp = time.monotonic()
+            if self.recorder is None:
+                self.recorder = FrameRecorder(self.path, frame.shape)
+            self.recorder.append(frame, timestamp)
+        return ret, frame
+
+    def release(self):
+        self.capture.release()
+        if self.recorder is not None:
+            self.recorder.close()
+            print(f"✓ Recorded {self.recorder.count} frames to {self.path}")
+
+
+class ReplaySource:
+    """
+    Plays a recording back with the cv2.VideoCapture read/isOpened/release API
+
+    read() returns views into the memory-mapped file: nothing is decoded or
+    copied. The mapping is copy-on-write, so drawing overlays on a returned
+    frame never changes the recording. With realtime=True frames are paced
+    by the recorded capture timestamps; otherwise they come as fast as the
+    consumer reads them, which makes regression runs deterministic.
+    """
+
+    def __init__(self, path, realtime=False):
+        header = np.fromfile(path, HEADER_DTYPE, count=1)
+        if len(header) == 0 or header["magic"][0] != MAGIC:
+            raise IOError(f"Not a frame recording: {path}")
+        header = header[0]
+        shape = (int(header["height"]), int(header["width"]), int(header["channels"]))
+        self.count = int(header["count"])
+        self.path = path
+        self.realtime = realtime
+
+        records = np.memmap(path, record_dtype(shape), "c", offset=HEADER_SIZE,
+                            shape=(self.count,)) if self.count else np.zeros(0, record_dtype(shape))
+        self.frames = records["frame"]
+        if shape[2] == 1:
+            self.frames = self.frames[..., 0]
+        self.timestamps = records["timestamp"]
+        self.frame_index = 0
+        self.opened = True
+        self.start_time = None
+
+    def isOpened(self):
+        return self.opened
+
+    def read(self):
+        if not self.opened or self.frame_index >= self.count:
+            return False, None
+
+        if self.realtime:
+            # Keep the recorded spacing between frames
+            now = time.monotonic()
+            if self.start_time is None:
+                self.start_time = now - (self.timestamps[self.frame_index] - self.timestamps[0])
+            delay = self.start_time + (self.timestamps[self.frame_index] - self.timestamps[0]) - now
+            if delay > 0:
+                time.sleep(delay)
+
+        frame = self.frames[self.frame_index]
+        self.frame_index += 1
+        return True, frame
+
+    def fps(self):
+        """Average capture rate of the recording"""
+        if self.count < 2:
+            return 30.0
+        duration = float(self.timestamps[-1] - self.timestamps[0])
+        return (self.count - 1) / duration if duration > 0 else 30.0
+
+    def set(self, prop, value):
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            self.frame_index = min(max(int(value), 0), self.count)
+            self.start_time = None
+            return True
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.frames.shape[2]) if self.count else 0.0
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.frames.shape[1]) if self.count else 0.0
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps()
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return float(self.count)
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return float(self.frame_index)
+        return 0.0
+
+    def release(self):
+        self.opened = False
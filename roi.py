@@ -0,0 +1,41 @@
+"""
+Region-of-interest windows for incremental blob tracking
+Detection runs only around the last known position while the blob is tracked
+"""
+
+import math
+
+# Window half-size is this many times the blob radius (sqrt of its area)
+ROI_SCALE = 2.0
+# Smallest half-size in pixels, so small blobs still have room to move
+ROI_MIN_HALF_SIZE = 48
+# Extra fraction of the window added for every consecutive missed frame
+ROI_GROWTH_PER_MISS = 0.5
+
+
+def roi_window(last_position, last_area, frames_lost, max_frames_lost, frame_shape):
+    """
+    Search window (x0, y0, x1, y1) around the last blob position
+
+    Returns None when a full-frame search is needed: no previous position,
+    or the blob has been lost for more than max_frames_lost frames.
+    On each miss the window grows by ROI_GROWTH_PER_MISS of its base size.
+    """
+    if last_position is None or frames_lost > max_frames_lost:
+        return None
+
+    height, width = frame_shape[:2]
+    half_size = max(ROI_MIN_HALF_SIZE, ROI_SCALE * math.sqrt(max(last_area, 1)))
+    half_size *= 1.0 + ROI_GROWTH_PER_MISS * frames_lost
+
+    cx, cy = last_position
+    x0 = max(0, int(cx - half_size))
+    y0 = max(0, int(cy - half_size))
+    x1 = min(width, int(cx + half_size) + 1)
+    y1 = min(height, int(cy + half_size) + 1)
+
+    # Window covers the whole frame anyway
+    if x0 == 0 and y0 == 0 and x1 == width and y1 == height:
+        return None
+
+    return x0, y0, x1, y1
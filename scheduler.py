@@ -0,0 +1,121 @@
+"""
+Deadline-driven adaptive quality for the control loop
+Steps quality down under time pressure and back up when there is slack
+"""
+
+import time
+
+# Quality levels, best first. Each level keeps the reductions of the ones above.
+QUALITY_LEVELS = (
+    "full quality",
+    "preview off",
+    "morphology off",
+    "detection at 1/2 scale",
+    "every 2nd frame",
+)
+
+
+class QualityScheduler:
+    """
+    Keeps the per-frame processing time within a budget (command_interval)
+
+    observe() takes the time spent on each loop iteration, including the
+    preview's render time even when another thread draws it, so that
+    turning the preview off lowers the frame time. When the smoothed
+    frame time stays above the budget for step_down_after frames, quality
+    drops one level. It goes back up one level after step_up_after frames
+    below headroom * budget. If the higher level turns out not to fit and
+    quality drops again straight away, the wait before the next attempt
+    doubles (up to 8x), so a level that is only just out of reach is
+    probed rarely instead of flip-flopping. Every change is logged.
+
+    apply(tracker) pushes the detection knobs to the tracker; the loop checks
+    preview_enabled and skip_frame() itself.
+    """
+
+    def __init__(self, budget=0.05, step_down_after=5, step_up_after=45, headroom=0.6,
+                 smoothing=0.2, log=print):
+        self.budget = budget
+        self.step_down_after = step_down_after
+        self.step_up_after = step_up_after
+        self.headroom = headroom
+        self.smoothing = smoothing
+        self.log = log
+
+        self.level = 0
+        self.frame_time = None    # Exponential moving average in seconds
+        self.over_budget = 0      # Consecutive frames above budget
+        self.with_slack = 0       # Consecutive frames with headroom
+        self.frame_index = 0
+        self.frames_at_level = 0
+        self.step_up_wait = step_up_after  # Grows after failed step-ups
+        self.stepped_up = False   # Whether the last change raised quality
+        self.changes = []         # (monotonic time, new level, frame time)
+
+    @property
+    def preview_enabled(self):
+        return self.level < 1
+
+    @property
+    def noise_removal(self):
+        return self.level < 2
+
+    @property
+    def detection_scale(self):
+        return 2 if self.level >= 3 else 1
+
+    @property
+    def frame_stride(self):
+        return 2 if self.level >= 4 else 1
+
+    def skip_frame(self):
+        """True when detection should be skipped on this frame"""
+        self.frame_index += 1
+        return self.frame_index % self.frame_stride != 0
+
+    def observe(self, frame_time):
+        """Record one loop iteration; returns True when the level changed"""
+        if self.frame_time is None:
+            self.frame_time = frame_time
+        else:
+            self.frame_time += self.smoothing * (frame_time - self.frame_time)
+
+        self.frames_at_level += 1
+        if self.stepped_up and self.frames_at_level == self.step_up_wait:
+            # The last step up held: go back to probing at the normal rate
+            self.step_up_wait = self.step_up_after
+
+        if self.frame_time > self.budget:
+            self.over_budget += 1
+            self.with_slack = 0
+        elif self.frame_time < self.budget * self.headroom:
+            self.with_slack += 1
+            self.over_budget = 0
+        else:
+            self.over_budget = self.with_slack = 0
+
+        if self.over_budget >= self.step_down_after and self.level < len(QUALITY_LEVELS) - 1:
+            if self.stepped_up and self.frames_at_level < self.step_up_wait:
+                # The level we just stepped up to does not fit: back off
+                self.step_up_wait = min(self.step_up_wait * 2, self.step_up_after * 8)
+            return self.set_level(self.level + 1)
+        if self.with_slack >= self.step_up_wait and self.level > 0:
+            return self.set_level(self.level - 1)
+        return False
+
+    def set_level(self, level):
+        self.stepped_up = level < self.level
+        self.level = level
+        self.over_budget = self.with_slack = 0
+        self.frames_at_level = 0
+        self.changes.append((time.monotonic(), level, self.frame_time))
+        if self.log is not None:
+            arrow = "↑" if self.stepped_up else "↓"
+            self.log(f"⚠ Quality {arrow} {QUALITY_LEVELS[level]} "
+                     f"(frame {self.frame_time * 1000:.1f}ms, budget {self.budget * 1000:.0f}ms)")
+        return True
+
+    def apply(self, tracker):
+        """Set the tracker's detection quality for the current level"""
+        tracker.noise_removal = self.noise_removal
+        tracker.detection_scale = self.detection_scale
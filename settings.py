@@ -5,8 +5,20 @@ Save and load tracking parameters
 
 import json
 import os
+import time
+from collections import namedtuple
 from pathlib import Path
 
+from blobs import SELECTION_POLICIES
+from noise_filter import NOISE_FILTERS
+
+# Immutable snapshot of tracker settings; version increases on every reload
+TrackerConfig = namedtuple("TrackerConfig", [
+    "version", "lower_hsv", "upper_hsv", "min_blob_area", "max_blob_area",
+    "dead_zone", "base_speed", "min_speed", "noise_filter",
+    "blob_selection", "roi_tracking",
+])
+
 class Settings:
     """Manages saving and loading blob tracker settings"""
     
@@ -21,23 +33,83 @@ class Settings:
             "min_blob_area": 500,
             "max_blob_area": 50000,
             "dead_zone": 50,
+            "base_speed": 220,
+            "min_speed": 180,
+            "noise_filter": "morphology",
+            "blob_selection": "average",
+            "roi_tracking": False,
             "description": "Default orange blob tracking settings"
         }
     
     @staticmethod
-    def save_settings(tracker, filename=None):
-        """Save current tracker settings to JSON file"""
-        if filename is None:
-            filename = Settings.SETTINGS_FILE
+    def config_from_dict(settings, version=0, defaults=None):
+        """
+        Build an immutable TrackerConfig, filling gaps from defaults
         
+        defaults is a settings dictionary such as settings_from_tracker(tracker),
+        so a missing key keeps the running tracker's value; keys missing there
+        too come from get_default_settings().
+        """
+        merged = Settings.get_default_settings()
+        merged.update(defaults or {})
+        merged.update(settings)
+        Settings.check_choices(merged)
+        return TrackerConfig(
+            version=version,
+            lower_hsv=tuple(int(v) for v in merged["lower_hsv"]),
+            upper_hsv=tuple(int(v) for v in merged["upper_hsv"]),
+            min_blob_area=int(merged["min_blob_area"]),
+            max_blob_area=int(merged["max_blob_area"]),
+            dead_zone=int(merged["dead_zone"]),
+            base_speed=int(merged["base_speed"]),
+            min_speed=int(merged["min_speed"]),
+            noise_filter=str(merged["noise_filter"]),
+            blob_selection=str(merged["blob_selection"]),
+            roi_tracking=bool(merged["roi_tracking"]),
+        )
+    
+    @staticmethod
+    def check_choices(settings):
+        """Raise ValueError for an unknown noise_filter or blob_selection"""
+        if "noise_filter" in settings and settings["noise_filter"] not in NOISE_FILTERS:
+            raise ValueError(f"Unknown noise_filter: {settings['noise_filter']}")
+        if "blob_selection" in settings and settings["blob_selection"] not in SELECTION_POLICIES:
+            raise ValueError(f"Unknown blob_selection: {settings['blob_selection']}")
+    
+    @staticmethod
+    def settings_from_tracker(tracker):
+        """A tracker's current settings as a settings dictionary"""
         settings = {
-            "lower_hsv": tracker.lower_hsv.tolist(),
-            "upper_hsv": tracker.upper_hsv.tolist(),
+            "lower_hsv": [int(v) for v in tracker.lower_hsv],
+            "upper_hsv": [int(v) for v in tracker.upper_hsv],
             "min_blob_area": tracker.min_blob_area,
             "max_blob_area": tracker.max_blob_area,
-            "timestamp": __import__('datetime').datetime.now().isoformat()
+            "dead_zone": tracker.dead_zone,
+            "noise_filter": tracker.noise_filter,
+            "blob_selection": tracker.blob_selection,
+            "roi_tracking": tracker.roi_tracking,
         }
         
+        # Rover control parameters (AutonomousBlobTracker only)
+        if hasattr(tracker, "base_speed"):
+            settings["base_speed"] = tracker.base_speed
+            settings["min_speed"] = getattr(tracker, "min_motor_speed", 180)
+        return settings
+    
+    @staticmethod
+    def config_from_tracker(tracker, version=0):
+        """Snapshot a tracker's current settings as a TrackerConfig"""
+        return Settings.config_from_dict(Settings.settings_from_tracker(tracker), version)
+    
+    @staticmethod
+    def save_settings(tracker, filename=None):
+        """Save current tracker settings to JSON file"""
+        if filename is None:
+            filename = Settings.SETTINGS_FILE
+        
+        settings = Settings.settings_from_tracker(tracker)
+        settings["timestamp"] = __import__('datetime').datetime.now().isoformat()
+        
         try:
             with open(filename, 'w') as f:
                 json.dump(settings, f, indent=2)
@@ -60,12 +132,22 @@ class Settings:
         try:
             with open(filename, 'r') as f:
                 settings = json.load(f)
+            # Reject the whole file before changing anything
+            Settings.check_choices(settings)
             
             import numpy as np
-            tracker.lower_hsv = np.array(settings.get("lower_hsv", [5, 100, 100]))
-            tracker.upper_hsv = np.array(settings.get("upper_hsv", [15, 255, 255]))
-            tracker.min_blob_area = settings.get("min_blob_area", 500)
-            tracker.max_blob_area = settings.get("max_blob_area", 50000)
+            # Missing keys keep the tracker's current values
+            tracker.lower_hsv = np.array(settings.get("lower_hsv", tracker.lower_hsv))
+            tracker.upper_hsv = np.array(settings.get("upper_hsv", tracker.upper_hsv))
+            tracker.min_blob_area = settings.get("min_blob_area", tracker.min_blob_area)
+            tracker.max_blob_area = settings.get("max_blob_area", tracker.max_blob_area)
+            tracker.dead_zone = settings.get("dead_zone", tracker.dead_zone)
+            tracker.noise_filter = settings.get("noise_filter", tracker.noise_filter)
+            tracker.blob_selection = settings.get("blob_selection", tracker.blob_selection)
+            tracker.roi_tracking = bool(settings.get("roi_tracking", tracker.roi_tracking))
+            if hasattr(tracker, "base_speed"):
+                tracker.base_speed = settings.get("base_speed", tracker.base_speed)
+                tracker.min_motor_speed = settings.get("min_speed", getattr(tracker, "min_motor_speed", 180))
             
             print(f"✓ Settings loaded from {filename}")
             return True
@@ -83,9 +165,9 @@ class Settings:
                 "description": "Default orange blob"
             },
             "red": {
-                "lower_hsv": [0, 100, 100],
+                "lower_hsv": [170, 100, 100],
                 "upper_hsv": [10, 255, 255],
-                "description": "Red blob"
+                "description": "Red blob (hue wraps around 179 -> 0)"
             },
             "blue": {
                 "lower_hsv": [100, 100, 100],
@@ -104,3 +186,58 @@ class Settings:
             }
         }
         return presets
+
+
+class SettingsWatcher:
+    """
+    Hot-reloads a settings JSON file for headless runs
+
+    poll() is cheap enough to call every frame: it only stats the file once
+    per check_interval seconds and re-reads it when the mtime changes.
+    Each successful reload produces a new immutable TrackerConfig snapshot
+    with a higher version number. Keys missing from the file are taken from
+    defaults (see Settings.config_from_dict), normally the entry point's
+    tracker as it was before the first reload.
+    """
+    
+    def __init__(self, filename=None, check_interval=0.5, defaults=None):
+        self.filename = filename or Settings.SETTINGS_FILE
+        self.check_interval = check_interval
+        self.defaults = defaults
+        self.last_check = 0.0
+        self.last_mtime = None
+        self.version = 0
+        self.config = None  # Stays None until the file has been read
+        self.reload()
+    
+    def reload(self):
+        """Read the file now; returns the new config, or None if unchanged/invalid"""
+        try:
+            mtime = os.stat(self.filename).st_mtime_ns
+        except OSError:
+            return None
+        if mtime == self.last_mtime:
+            return None
+        self.last_mtime = mtime
+        
+        try:
+            with open(self.filename, 'r') as f:
+                settings = json.load(f)
+            config = Settings.config_from_dict(settings, version=self.version + 1,
+                                              defaults=self.defaults)
+        except (ValueError, KeyError, TypeError) as e:
+            # Keep running on the previous snapshot while the file is being edited
+            print(f"✗ Ignoring invalid settings in {self.filename}: {e}")
+            return None
+        
+        self.version = config.version
+        self.config = config
+        return config
+    
+    def poll(self):
+        """Return a new TrackerConfig if the file changed since the last check"""
+        now = time.monotonic()
+        if now - self.last_check < self.check_interval:
+            return None
+        self.last_check = now
+        return self.reload()